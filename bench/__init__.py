@@ -0,0 +1,8 @@
+"""Reproducible performance measurements, run on CPython against the simulator.
+
+    python -m bench.run --output before.json
+    python -m bench.compare before.json after.json
+
+Absolute numbers are host numbers (see PERFORMANCE.md, "Host Simulator");
+the suite is meant for comparing commits on the same machine.
+"""
@@ -0,0 +1,58 @@
+"""Compare two bench.run results, e.g. before and after a commit.
+
+    python -m bench.compare before.json after.json [--threshold 10]
+
+Prints every numeric result present in both files with its relative change;
+changes beyond the threshold (percent) are flagged with ``!``.
+"""
+
+import argparse
+import json
+
+SKIP = ("environment", "parameters")  # top-level sections
+COUNTS = ("count",)  # sample sizes, not results
+
+
+def flatten(node, prefix=""):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if not prefix and key in SKIP:
+                continue
+            yield from flatten(value, prefix + "." + key if prefix else key)
+    elif isinstance(node, (int, float)) and not isinstance(node, bool):
+        if prefix.rsplit(".", 1)[-1] not in COUNTS:
+            yield prefix, node
+
+
+def compare(before, after, threshold):
+    old = dict(flatten(before))
+    rows = []
+    for key, new in flatten(after):
+        if key not in old:
+            continue
+        prev = old[key]
+        change = (new - prev) / abs(prev) * 100 if prev else (0.0 if new == prev else None)
+        flag = "!" if change is None or abs(change) > threshold else " "
+        rows.append((flag, key, prev, new, change))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    args = parser.parse_args(argv)
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    for name, result in (("before", before), ("after", after)):
+        print("{:6} {}".format(name, result.get("environment", {}).get("commit")))
+    for flag, key, prev, new, change in compare(before, after, args.threshold):
+        pct = "   new" if change is None else "{:+6.1f}%".format(change)
+        print("{} {:60} {:>12} {:>12} {}".format(flag, key, prev, new, pct))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""CRC-8 micro-benchmark: bit-by-bit loop vs. table lookup vs. check_frame().
+
+Runs on CPython and on the MicroPython unix port, from the repository root:
+
+    python -m bench.crc8 [iterations]
+    micropython bench/crc8.py [iterations]
+
+Prints one JSON object: microseconds per 6-byte frame check for each variant
+and the speedup over the bit-by-bit loop.
+"""
+
+import json
+import sys
+
+try:
+    from time import perf_counter
+
+    def now_us():
+        return int(perf_counter() * 1000000)
+
+    def elapsed_us(start):
+        return now_us() - start
+
+except ImportError:  # MicroPython
+    from time import ticks_diff, ticks_us as now_us
+
+    def elapsed_us(start):
+        return ticks_diff(now_us(), start)
+
+
+if "drivers" not in sys.modules:
+    # `micropython bench/crc8.py` puts bench/ first on the path, not the root
+    root = __file__.rsplit("/", 2)[0] if __file__.count("/") >= 2 else "."
+    if root not in sys.path:
+        sys.path.append(root)
+
+from drivers.crc8 import TABLE, check_frame, crc8  # noqa: E402
+
+FRAME = bytearray(b"\x66\x95\x00\x8c\x20\x00")  # 25.1C / 54.7%RH
+
+
+def crc8_bitwise(data):
+    # The previous SHT31._crc
+    crc = 0xFF
+    for b in data:
+        crc ^= b
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x31) & 0xFF if (crc & 0x80) else (crc << 1) & 0xFF
+    return crc
+
+
+def check_bitwise(d):
+    return crc8_bitwise(d[0:2]) == d[2] and crc8_bitwise(d[3:5]) == d[5]
+
+
+def check_table(d):
+    return crc8(d, 0, 2) == d[2] and crc8(d, 3, 5) == d[5]
+
+
+def run(check, frame, n):
+    start = now_us()
+    for _ in range(n):
+        check(frame)
+    return elapsed_us(start) / n
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    frame = FRAME
+    frame[2] = crc8_bitwise(frame[0:2])
+    frame[5] = crc8_bitwise(frame[3:5])
+
+    for i in range(256):
+        assert TABLE[i] == crc8_bitwise(bytes((i ^ 0xFF,))), "bad table entry"
+    assert check_bitwise(frame) and check_table(frame) and check_frame(frame)
+
+    results = {}
+    for name, check in (
+        ("bitwise", check_bitwise),
+        ("table", check_table),
+        ("check_frame", check_frame),
+    ):
+        run(check, frame, n // 10)  # warm-up
+        results[name] = run(check, frame, n)
+
+    base = results["bitwise"]
+    print(json.dumps({
+        "implementation": sys.implementation.name,
+        "iterations": n,
+        "us_per_frame": {k: round(v, 3) for k, v in results.items()},
+        "speedup": {k: round(base / v, 1) for k, v in results.items() if v},
+    }))
+
+
+if __name__ == "__main__":
+    main()
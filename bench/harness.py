@@ -0,0 +1,190 @@
+"""Shared pieces of the benchmarks: booting the firmware, a minimal HTTP
+client, in-memory streams and statistics."""
+
+import asyncio
+import atexit
+import json
+import math
+import os
+import shutil
+import socket
+import sys
+import tempfile
+
+
+class NullOutput:
+    """A stdout sink: the firmware logs every request and tick."""
+
+    def write(self, s):
+        return len(s)
+
+    def flush(self):
+        pass
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def boot(**board_options):
+    """Boot main.py on the simulated board; returns (firmware, board).
+
+    The server is started by ``firmware.main()``, on ``firmware.HTTP_PORT``.
+    The scratch filesystem is deleted on exit.
+    """
+    from sim.run import boot as sim_boot
+
+    fs = tempfile.mkdtemp(prefix="pyroaster-bench-")
+    atexit.register(shutil.rmtree, fs, ignore_errors=True)
+    return sim_boot(port=free_port(), fs=fs, **board_options)
+
+
+async def wait_for_server(port, timeout=10.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            if loop.time() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+def encode_request(method, path, body=None, headers=None, version="1.0"):
+    lines = ["{} {} HTTP/{}".format(method, path, version), "Host: localhost"]
+    payload = b""
+    if body is not None:
+        payload = json.dumps(body).encode()
+        lines.append("Content-Type: application/json")
+        lines.append("Content-Length: {}".format(len(payload)))
+    for name, value in (headers or {}).items():
+        lines.append("{}: {}".format(name, value))
+    return ("\r\n".join(lines) + "\r\n\r\n").encode() + payload
+
+
+async def http_request(port, method, path, body=None):
+    """One request on a new connection; returns (status, body bytes)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(encode_request(method, path, body))
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1]) if head else 0
+    return status, payload
+
+
+async def persistent_request(reader, writer, method, path, body=None):
+    """One HTTP/1.1 request on an open connection.
+
+    Returns (status, body bytes, keep_alive): the response is read up to its
+    Content-Length, or to the end of the stream if the server closes.
+    """
+    writer.write(encode_request(method, path, body, version="1.1"))
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    headers = {}
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        headers[name.strip().lower()] = value.strip().lower()
+    keep_alive = headers.get(b"connection") == b"keep-alive"
+    if b"content-length" in headers:
+        payload = await reader.readexactly(int(headers[b"content-length"]))
+    else:
+        payload = await reader.read()
+        keep_alive = False
+    return status, payload, keep_alive
+
+
+class MemoryWriter:
+    """In-memory stand-in for the server side of a socket.
+
+    ``writes`` counts write calls, i.e. what becomes a TCP segment on the
+    ESP32 (no Nagle buffering there).
+    """
+
+    def __init__(self):
+        self.writes = 0
+        self.bytes = 0
+
+    def write(self, data):
+        self.writes += 1
+        self.bytes += len(data)
+
+    async def drain(self):
+        pass
+
+    async def awrite(self, data):
+        self.write(data)
+
+    def close(self):
+        pass
+
+    async def aclose(self):
+        pass
+
+    async def wait_closed(self):
+        pass
+
+    def get_extra_info(self, name, default=None):
+        return ("127.0.0.1", 50000) if name == "peername" else default
+
+
+def memory_request(raw):
+    """A (reader, writer) pair that replays one raw request."""
+    reader = asyncio.StreamReader()
+    reader.feed_data(raw)
+    reader.feed_eof()
+    return reader, MemoryWriter()
+
+
+def summarize(samples, scale=1.0, digits=3):
+    """count/mean/p50/p99/max of a list of numbers, multiplied by scale."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pct(p):
+        # nearest-rank percentile
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered) * scale, digits),
+        "p50": round(pct(50) * scale, digits),
+        "p99": round(pct(99) * scale, digits),
+        "max": round(ordered[-1] * scale, digits),
+    }
+
+
+def git_commit(root):
+    try:
+        import subprocess
+
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=root, capture_output=True, text=True, timeout=5,
+        )
+        return out.stdout.strip() or None
+    except (OSError, ValueError):
+        return None
+
+
+def environment(root):
+    import platform
+
+    return {
+        "commit": git_commit(root),
+        "python": sys.version.split()[0],
+        "implementation": sys.implementation.name,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
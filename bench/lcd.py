@@ -0,0 +1,136 @@
+"""LCD update micro-benchmark: full-line putstr() vs. the diffing renderer.
+
+    python -m bench.lcd [seconds]
+
+Drives the previous LcdController.show_data() and the current one (drawn by
+its run() task) with the same roast (temperature ramp, humidity drift, countdown timer and the IP
+shown at boot), one call per logic_loop tick, against the simulated PCF8574.
+Prints one JSON object: I2C transactions, bytes and the bus time they take
+at 400kHz, per simulated second, and checks both leave the same text.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import sim  # noqa: E402
+
+sim.install()
+
+import machine  # noqa: E402
+import lib.lcd  # noqa: E402
+from drivers.machine_i2c_lcd import I2cLcd  # noqa: E402
+from lib.lcd import LcdController, _pad  # noqa: E402
+from sim.devices import LCD  # noqa: E402
+from utils import format_time  # noqa: E402
+
+ADDR = 0x27
+BUS = 1
+COLS = 16
+I2C_HZ = 400000
+IP_TICKS = 5  # show_ip() override, 5s
+
+
+class Clock:
+    """Simulated ticks_ms() for lib.lcd, one second per logic_loop tick."""
+
+    def __init__(self):
+        self.ms = 0
+
+    def ticks_ms(self):
+        return self.ms
+
+    @staticmethod
+    def ticks_add(ticks, delta):
+        return ticks + delta
+
+    @staticmethod
+    def ticks_diff(a, b):
+        return a - b
+
+
+class OldLcdController:
+    # The previous LcdController, without the error handling
+    def __init__(self):
+        self.lcd = I2cLcd(machine.I2C(BUS), ADDR, 2, COLS)
+        self.last = [None, None]
+        self.ip_ticks = 0
+
+    def show_ip(self, ip):
+        self.show_line(1, ip)
+        self.ip_ticks = IP_TICKS
+
+    def show_line(self, row, line):
+        line = _pad(line, COLS)
+        if line != self.last[row]:
+            self.lcd.move_to(0, row)
+            self.lcd.putstr(line)
+            self.last[row] = line
+
+    def show_data(self, temperature, humidity, time_in_seconds):
+        self.show_line(0, f"T: {temperature}C H: {humidity}%")
+        if self.ip_ticks:
+            self.ip_ticks -= 1
+        else:
+            self.show_line(1, format_time(time_in_seconds))
+
+
+def roast(seconds):
+    # (temperature, humidity, timer) per logic_loop tick
+    for t in range(seconds):
+        temperature = round(25 + 175 * t / seconds + (t % 7) * 0.2)
+        humidity = 55 - t * 30 // seconds + (t // 10) % 2
+        yield temperature, humidity, seconds - t
+
+
+async def measure(make, seconds):
+    clock = Clock()
+    lib.lcd.time = clock
+    device = LCD()
+    machine.attach_i2c(BUS, ADDR, device)
+    controller = make()
+    task = asyncio.create_task(controller.run()) if hasattr(controller, "run") else None
+    device.transactions = device.bytes = 0  # don't count the display init
+    controller.show_ip("192.168.4.1")
+    start = time.perf_counter()
+    for temperature, humidity, timer in roast(seconds):
+        controller.show_data(temperature, humidity, timer)
+        for _ in range(3):  # let run() draw both rows
+            await asyncio.sleep(0)
+        clock.ms += 1000
+    cpu_ms = (time.perf_counter() - start) * 1000
+    if task is not None:
+        task.cancel()
+    # 9 clocks per byte, plus the address byte of each transaction
+    bus_ms = (device.bytes + device.transactions) * 9 * 1000 / I2C_HZ
+    return device.lines(), {
+        "transactions_per_s": round(device.transactions / seconds, 1),
+        "bytes_per_s": round(device.bytes / seconds, 1),
+        "bus_ms_per_s": round(bus_ms / seconds, 3),
+        "host_cpu_us_per_update": round(cpu_ms * 1000 / seconds, 1),
+    }
+
+
+def main():
+    seconds = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    old_lines, old = asyncio.run(measure(OldLcdController, seconds))
+    new_lines, new = asyncio.run(measure(lambda: LcdController(None, None), seconds))
+    assert old_lines == new_lines, (old_lines, new_lines)
+    results = {
+        "seconds": seconds,
+        "final_text": new_lines,
+        "full_line": old,
+        "diffed": new,
+        "bus_time_reduction": round(old["bus_ms_per_s"] / new["bus_ms_per_s"], 1),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
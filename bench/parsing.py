@@ -0,0 +1,131 @@
+"""Request parsing micro-benchmark: header dict vs. lazily parsed headers.
+
+    python -m bench.parsing [iterations]
+
+Parses a request as the dashboard's browser sends it (a PATCH with a JSON
+body and 12 headers) with the previous Request.create() and the current one,
+then reads the headers the firmware uses (Content-Length, Content-Type,
+Cookie, Origin, Connection). Prints one JSON object: microseconds and the
+tracemalloc high-water in bytes per request.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from microdot.microdot import NoCaseDict, Request  # noqa: E402
+
+BODY = b'{"starting_temperature": 180}'
+RAW = (
+    b"PATCH /controller_config HTTP/1.1\r\n"
+    b"Host: 192.168.4.1\r\n"
+    b"Connection: keep-alive\r\n"
+    b"Content-Length: " + str(len(BODY)).encode() + b"\r\n"
+    b"User-Agent: Mozilla/5.0 (Linux; Android 14; Pixel 7) AppleWebKit/537.36 "
+    b"(KHTML, like Gecko) Chrome/126.0.0.0 Mobile Safari/537.36\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Accept: */*\r\n"
+    b"Origin: http://192.168.4.1\r\n"
+    b"Referer: http://192.168.4.1/\r\n"
+    b"Accept-Encoding: gzip, deflate\r\n"
+    b"Accept-Language: en-US,en;q=0.9,es;q=0.8\r\n"
+    b"Sec-Fetch-Mode: cors\r\n"
+    b"Sec-Fetch-Site: same-origin\r\n"
+    b"\r\n" + BODY
+)
+USED = ("Content-Length", "Content-Type", "Cookie", "Origin", "Connection")
+
+
+class Reader:
+    """Replays RAW; a minimal stand-in for a StreamReader."""
+
+    def __init__(self):
+        self.pos = 0
+
+    async def readline(self):
+        end = RAW.index(b"\n", self.pos) + 1
+        line = RAW[self.pos : end]
+        self.pos = end
+        return line
+
+    async def readexactly(self, n):
+        data = RAW[self.pos : self.pos + n]
+        self.pos += n
+        return data
+
+
+async def create_eager(reader):
+    # The previous Request.create()
+    line = (await Request._safe_readline(reader)).strip().decode()
+    method, url, http_version = line.split()
+    http_version = http_version.split("/", 1)[1]
+    headers = NoCaseDict()
+    content_length = 0
+    while True:
+        line = (await Request._safe_readline(reader)).strip().decode()
+        if line == "":
+            break
+        header, value = line.split(":", 1)
+        value = value.strip()
+        headers[header] = value
+        if header.lower() == "content-length":
+            content_length = int(value)
+    body = await reader.readexactly(content_length)
+    return Request(None, None, method, url, http_version, headers, body=body)
+
+
+async def create_lazy(reader, buffer):
+    return await Request.create(None, reader, None, None, buffer=buffer)
+
+
+async def measure(parse, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        req = await parse(Reader())
+        for name in USED:
+            req.headers.get(name)
+    us = (time.perf_counter() - start) * 1000000 / n
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    req = await parse(Reader())
+    for name in USED:
+        req.headers.get(name)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return {"us": round(us, 2), "peak_bytes": peak}
+
+
+async def run(n):
+    buffer = bytearray(Request.header_buffer_size)  # one per connection
+
+    async def lazy(reader):
+        return await create_lazy(reader, buffer)
+
+    eager = await create_eager(Reader())
+    for name in USED:
+        assert eager.headers.get(name) == (await lazy(Reader())).headers.get(name)
+
+    results = {}
+    for name, parse in (("eager", create_eager), ("lazy", lazy)):
+        await measure(parse, n // 10)  # warm-up
+        results[name] = await measure(parse, n)
+    return results
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    results = asyncio.run(run(n))
+    print(json.dumps({"iterations": n, "request_bytes": len(RAW), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Route lookup micro-benchmark: linear URL map scan vs. the RouteIndex.
+
+    python -m bench.routing [iterations]
+
+Builds apps shaped like main.py (mostly static routes plus a few with
+arguments) with 10, 50 and 200 routes and times Microdot.find_route() for a
+static hit, an argument hit, a miss and an OPTIONS preflight. Prints one
+JSON object with microseconds per lookup.
+"""
+
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from microdot.microdot import Microdot  # noqa: E402
+
+SIZES = (10, 50, 200)
+
+
+class Request:
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.url_args = None
+
+
+def handler(request):
+    pass
+
+
+def make_app(n):
+    app = Microdot()
+    for i in range(n - 3):
+        app.route("/route{}".format(i), methods=["GET", "POST"])(handler)
+    app.route("/config/<name>", methods=["GET", "PUT"])(handler)
+    app.route("/history/<int:minutes>")(handler)
+    app.route("/time", methods=["POST"])(handler)  # last: the worst case of a scan
+    return app
+
+
+def find_route_linear(app, req):
+    # The previous Microdot.find_route()
+    method = req.method.upper()
+    if method == "OPTIONS":
+        allow = []
+        for route_methods, route_pattern, _, _, _ in app.url_map:
+            if route_pattern.match(req.path) is not None:
+                allow.extend(route_methods)
+        if "GET" in allow:
+            allow.append("HEAD")
+        allow.append("OPTIONS")
+        return {"Allow": ", ".join(allow)}, "", None
+    if method == "HEAD":
+        method = "GET"
+    f = 404
+    p = ""
+    s = None
+    for route_methods, route_pattern, route_handler, url_prefix, subapp in app.url_map:
+        req.url_args = route_pattern.match(req.path)
+        if req.url_args is not None:
+            p = url_prefix
+            s = subapp
+            if method in route_methods:
+                f = route_handler
+                break
+            else:
+                f = 405
+    return f, p, s
+
+
+def find_route_indexed(app, req):
+    return app.find_route(req)
+
+
+CASES = (
+    ("static", "POST", "/time"),
+    ("argument", "GET", "/config/pid"),
+    ("miss", "GET", "/favicon.ico"),
+    ("options", "OPTIONS", "/time"),
+)
+
+
+def run(find, app, req, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        find(app, req)
+    return (time.perf_counter() - start) * 1000000 / n
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    results = {}
+    for size in SIZES:
+        app = make_app(size)
+        by_case = {}
+        for case, method, path in CASES:
+            req = Request(method, path)
+            linear = find_route_linear(app, req)
+            assert find_route_indexed(app, req) == linear, (case, size)
+            timings = {}
+            for name, find in (("linear", find_route_linear), ("indexed", find_route_indexed)):
+                run(find, app, req, n // 10)  # warm-up
+                timings[name + "_us"] = round(run(find, app, req, n), 3)
+            timings["speedup"] = round(timings["linear_us"] / timings["indexed_us"], 1)
+            by_case[case] = timings
+        results[str(size)] = by_case
+    print(json.dumps({"iterations": n, "routes": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""Boot main.py on the simulator and measure it; results are printed as JSON.
+
+    python -m bench.run                      # full run (~1 min)
+    python -m bench.run --quick -o out.json  # smoke run, saved to a file
+
+Benchmarks (``--only`` selects a subset):
+
+- ``latency``: p50/p99 per route, one request per connection, sequential
+- ``keepalive``: the same over one HTTP/1.1 connection per route, reopened
+  only when the server closes it
+- ``sse``: event throughput with 1-16 concurrent /events clients while a
+  producer publishes as fast as the event loop allows
+- ``jitter``: logic_loop period error, idle and under concurrent HTTP load
+- ``alloc``: heap high-water above the baseline and bytes still held after a
+  collection, per request (tracemalloc), plus the number of response writes
+  and bytes; the request is replayed from memory, without a socket
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from bench.harness import (  # noqa: E402
+    NullOutput,
+    boot,
+    encode_request,
+    environment,
+    http_request,
+    memory_request,
+    persistent_request,
+    summarize,
+    wait_for_server,
+)
+
+ROUTES = (
+    ("POST", "/time", {"action": "add"}),
+    ("GET", "/controller_config", None),
+    ("POST", "/motors", {"motor_a": False}),
+    ("GET", "/config", None),
+)
+LOGIC_PERIOD_MS = 1000
+SSE_EVENTS = ("sensors", "time", "states", "controller")
+BENCHMARKS = ("latency", "keepalive", "sse", "jitter", "alloc")
+
+
+async def bench_latency(port, requests, warmup=10):
+    results = {}
+    for method, path, body in ROUTES:
+        for _ in range(warmup):
+            await http_request(port, method, path, body)
+        samples = []
+        errors = 0
+        for _ in range(requests):
+            t0 = time.perf_counter()
+            status, _ = await http_request(port, method, path, body)
+            samples.append(time.perf_counter() - t0)
+            errors += status >= 400
+        result = summarize(samples, scale=1000)
+        result["errors"] = errors
+        results["{} {}".format(method, path)] = result
+    return results
+
+
+async def _keepalive_requests(port, method, path, body, n):
+    """n requests on as few connections as the server allows."""
+    samples = []
+    errors = 0
+    connections = 0
+    connection = None
+    for _ in range(n):
+        t0 = time.perf_counter()
+        if connection is None:
+            connection = await asyncio.open_connection("127.0.0.1", port)
+            connections += 1
+        status, _, keep_alive = await persistent_request(*connection, method, path, body)
+        samples.append(time.perf_counter() - t0)
+        errors += status >= 400
+        if not keep_alive:
+            connection[1].close()
+            connection = None
+    if connection is not None:
+        connection[1].close()
+    return samples, errors, connections
+
+
+async def bench_keepalive(port, requests, warmup=10):
+    results = {}
+    for method, path, body in ROUTES:
+        await _keepalive_requests(port, method, path, body, warmup)
+        samples, errors, connections = await _keepalive_requests(
+            port, method, path, body, requests
+        )
+        result = summarize(samples, scale=1000)
+        result["errors"] = errors
+        result["connections"] = connections
+        results["{} {}".format(method, path)] = result
+    await asyncio.sleep(0.1)  # let the server close its side of the connections
+    return results
+
+
+async def _sse_client(port, counts, i):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(encode_request("GET", "/events"))
+        await writer.drain()
+        await reader.readuntil(b"\r\n\r\n")
+        tail = b""
+        while True:
+            chunk = await reader.read(4096)
+            if not chunk:
+                break
+            counts[i] += (tail + chunk).count(b"\n\n")  # one blank line per frame
+            tail = chunk[-1:]
+    finally:
+        writer.close()
+
+
+async def _wait_clients(events, n, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while events.stats()["clients"] != n and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+    return events.stats()["clients"] == n
+
+
+async def bench_sse(firmware, port, client_counts, duration):
+    events = firmware.events
+    payload = firmware.sensorc.get_json()
+    base = events.stats()["clients"]
+    results = {}
+    for n in client_counts:
+        before = events.stats()
+        counts = [0] * n
+        clients = [asyncio.create_task(_sse_client(port, counts, i)) for i in range(n)]
+        if not await _wait_clients(events, base + n):
+            raise RuntimeError("{} SSE clients did not all subscribe".format(n))
+        await asyncio.sleep(0.2)  # let the replayed frames through
+        start = sum(counts)
+
+        published = 0
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < duration:
+            events.publish(payload, event=SSE_EVENTS[published % len(SSE_EVENTS)])
+            published += 1
+            await asyncio.sleep(0)
+        elapsed = time.perf_counter() - t0
+        await asyncio.sleep(0.3)
+        delivered = sum(counts) - start
+
+        for task in clients:
+            task.cancel()
+        await asyncio.gather(*clients, return_exceptions=True)
+        await _wait_clients(events, base)
+        after = events.stats()
+
+        results[str(n)] = {
+            "published_per_s": round(published / elapsed, 1),
+            "delivered_per_s": round(delivered / elapsed, 1),
+            "delivered_per_client_per_s": round(delivered / elapsed / n, 1),
+            "delivery_ratio": round(delivered / (published * n), 4) if published else None,
+            "dropped": after["dropped"] - before["dropped"],
+            "coalesced": after["coalesced"] - before["coalesced"],
+            "evicted": after["evicted"] - before["evicted"],
+        }
+    return results
+
+
+async def _load_client(port, done):
+    i = 0
+    while True:
+        method, path, body = ROUTES[i % len(ROUTES)]
+        await http_request(port, method, path, body)
+        done[0] += 1
+        i += 1
+
+
+async def bench_jitter(firmware, port, duration, load_clients):
+    sensorc = firmware.sensorc
+    read_sensor_data = sensorc.read_sensor_data
+    stamps = []
+
+    def stamped():
+        stamps.append(time.perf_counter())
+        return read_sensor_data()
+
+    sensorc.read_sensor_data = stamped
+
+    def period_error():
+        return [(b - a) * 1000 - LOGIC_PERIOD_MS for a, b in zip(stamps, stamps[1:])]
+
+    try:
+        await asyncio.sleep(duration)
+        idle = summarize(period_error())
+
+        stamps.clear()
+        done = [0]
+        load = [asyncio.create_task(_load_client(port, done)) for _ in range(load_clients)]
+        await asyncio.sleep(duration)
+        loaded = summarize(period_error())
+        loaded["requests_per_s"] = round(done[0] / duration, 1)
+        loaded["clients"] = load_clients
+        for task in load:
+            task.cancel()
+        await asyncio.gather(*load, return_exceptions=True)
+    finally:
+        del sensorc.read_sensor_data
+    return {"period_ms": LOGIC_PERIOD_MS, "idle_ms": idle, "load_ms": loaded}
+
+
+async def bench_alloc(firmware, requests, warmup=3):
+    import tracemalloc
+
+    app = firmware.app
+    results = {}
+    tracemalloc.start()
+    try:
+        for method, path, body in ROUTES:
+            raw = encode_request(method, path, body)
+            for _ in range(warmup):
+                await app.handle_request(*memory_request(raw))
+            peaks, retained = [], []
+            writer = None
+            for _ in range(requests):
+                reader, writer = memory_request(raw)
+                gc.collect()
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                await app.handle_request(reader, writer)
+                peak = tracemalloc.get_traced_memory()[1]
+                gc.collect()
+                peaks.append(peak - base)
+                retained.append(tracemalloc.get_traced_memory()[0] - base)
+            results["{} {}".format(method, path)] = {
+                "peak_bytes": summarize(peaks, digits=0),
+                "retained_bytes": summarize(retained, digits=0),
+                "response_writes": writer.writes,
+                "response_bytes": writer.bytes,
+            }
+    finally:
+        tracemalloc.stop()
+    return results
+
+
+async def run(args):
+    firmware, _ = boot(plant_speed=args.plant_speed)
+    # The board caps open sockets (app.max_streams for /events,
+    # app.max_connections for the rest, and for /events clients until their
+    # stream starts); the SSE and load benchmarks measure throughput past
+    # that, so make room for every client plus the benchmark's own requests
+    app = firmware.app
+    app.max_streams = max(app.max_streams, max(args.sse_clients))
+    needed = max(args.sse_clients + [args.load_clients]) + 2
+    app.max_connections = max(app.max_connections, needed)
+    port = firmware.HTTP_PORT
+    task = asyncio.create_task(firmware.main())
+    await wait_for_server(port)
+    await asyncio.sleep(1.5)  # first logic_loop tick
+
+    results = {"environment": environment(ROOT), "parameters": vars(args).copy()}
+    try:
+        if "latency" in args.only:
+            results["latency_ms"] = await bench_latency(port, args.requests)
+        if "keepalive" in args.only:
+            results["keepalive_latency_ms"] = await bench_keepalive(port, args.requests)
+        if "sse" in args.only:
+            results["sse"] = await bench_sse(firmware, port, args.sse_clients, args.sse_duration)
+        if "jitter" in args.only:
+            results["logic_loop_jitter"] = await bench_jitter(
+                firmware, port, args.jitter_duration, args.load_clients
+            )
+        if "alloc" in args.only:
+            results["alloc_per_request"] = await bench_alloc(firmware, args.alloc_requests)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    return results
+
+
+def parse_args(argv=None):
+    def int_list(s):
+        return [int(x) for x in s.split(",") if x]
+
+    def names(s):
+        chosen = [x for x in s.split(",") if x]
+        unknown = set(chosen) - set(BENCHMARKS)
+        if unknown:
+            raise argparse.ArgumentTypeError("unknown benchmark(s): " + ", ".join(sorted(unknown)))
+        return chosen
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", help="write the JSON here instead of stdout")
+    parser.add_argument("--only", type=names, default=list(BENCHMARKS),
+                        help="comma-separated subset of: " + ",".join(BENCHMARKS))
+    parser.add_argument("--quick", action="store_true", help="short run for smoke testing")
+    parser.add_argument("--requests", type=int, default=200, help="requests per route (latency)")
+    parser.add_argument("--sse-clients", type=int_list, default=[1, 2, 4, 8, 16])
+    parser.add_argument("--sse-duration", type=float, default=3.0, help="seconds per client count")
+    parser.add_argument("--jitter-duration", type=float, default=10.0,
+                        help="seconds idle, then seconds under load")
+    parser.add_argument("--load-clients", type=int, default=4, help="concurrent HTTP clients")
+    parser.add_argument("--alloc-requests", type=int, default=50, help="requests per route (alloc)")
+    parser.add_argument("--plant-speed", type=float, default=1.0)
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.requests = min(args.requests, 30)
+        args.sse_clients = [n for n in args.sse_clients if n in (1, 16)] or args.sse_clients[:1]
+        args.sse_duration = min(args.sse_duration, 1.0)
+        args.jitter_duration = min(args.jitter_duration, 4.0)
+        args.alloc_requests = min(args.alloc_requests, 10)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    stdout = sys.stdout
+    sys.stdout = NullOutput()  # the firmware prints every request and tick
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        sys.stdout = stdout
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,74 @@
+import time
+
 from lib.timer import TimerController
 from lib.motors import MotorController
 from lib.sensors import SensorController
+from lib.heater import HeaterController
+from lib.pid import PID
+from lib.profile import RoastProfile
+
+MODES = ("threshold", "pid")
+
+# How often the PID output is recomputed; the heater PWM itself is updated on
+# every run_heater() call.
+PID_PERIOD_MS = 1000
 
 
 class Controller:
     def __init__(
-        self, sensor: SensorController, timer: TimerController, motor: MotorController
+        self,
+        sensor: SensorController,
+        timer: TimerController,
+        motor: MotorController,
+        heater: HeaterController = None,
     ):
         self.__sensor = sensor
         self.__timer = timer
         self.__motor = motor
+        self.__heater = heater
 
         self.__starting_temperature = 0
         self.__time = 0
         self.__is_active = False
 
+        # "threshold": only the temperature -> motor -> timer sequence.
+        # "pid": the sequence plus closed-loop heater control to `setpoint`.
+        self.__mode = "threshold"
+        self.__setpoint = 0
+        self.__pid = PID(kp=0.04, ki=0.0004, kd=0.6)
+        self.__pid_elapsed = 0
+
+        self.__profile = None
+        self.__profile_start = 0
+
+        # Bumped whenever get_config() would return something different
+        self.__version = 0
+        self.__config = None  # get_config() result, valid for __config_version
+        self.__config_version = -1
+
     def activate(self):
         """
-        Activate the controller
+        Activate the controller. A loaded profile starts over from its first
+        waypoint.
         """
-        self.__is_active = True
+        if not self.__is_active:
+            self.__is_active = True
+            self.__version += 1
+        if self.__profile is not None:
+            self.__profile.reset()
+            self.__profile_start = time.ticks_ms()
 
     def deactivate(self):
         """
         Deactivate the controller
         """
+        changed = self.__is_active
         self.__is_active = False
+        if self.__heater is not None:
+            changed = changed or round(self.__heater.get_duty() * 100) != 0
+            self.__heater.off()
+        if changed:
+            self.__version += 1
 
     def run(self):
         """
@@ -34,10 +77,16 @@ class Controller:
         This function is starts the timer and starts the motor "A" when the temperature reaches the starting temperature.
 
         When the timer finishes, it starts the motor "B" and "C".
+
+        With a profile loaded, the heater setpoint follows the profile and its
+        motor events fire as their time is reached.
         """
         if not self.__is_active:
             return
 
+        if self.__profile is not None:
+            self.__run_profile()
+
         if not self.__timer.get_timer_status():
             if not self.__sensor.has_error() and self.__sensor.get_temperature() >= self.__starting_temperature:
                 self.__motor.start_motor_a()
@@ -49,6 +98,80 @@ class Controller:
             self.__motor.start_motor_c()
             self.deactivate()
 
+    def __run_profile(self):
+        t = time.ticks_diff(time.ticks_ms(), self.__profile_start) // 1000
+        setpoint = round(self.__profile.setpoint(t), 1)
+        if setpoint != self.__setpoint:
+            self.__setpoint = setpoint
+            self.__version += 1
+        while True:
+            event = self.__profile.next_event(t)
+            if event is None:
+                break
+            mask, states = event
+            for bit, start, stop in (
+                (1, self.__motor.start_motor_a, self.__motor.stop_motor_a),
+                (2, self.__motor.start_motor_b, self.__motor.stop_motor_b),
+                (4, self.__motor.start_motor_c, self.__motor.stop_motor_c),
+            ):
+                if mask & bit:
+                    start() if states & bit else stop()
+
+    def set_profile(self, waypoints):
+        """
+        Load a roast profile (see RoastProfile), or clear it with None or an
+        empty list. Validated here, once.
+
+        :raises ValueError: if the waypoints are invalid
+        """
+        self.__profile = RoastProfile(waypoints) if waypoints else None
+        self.__version += 1
+        if self.__profile is not None and self.__is_active:
+            self.__profile_start = time.ticks_ms()
+
+    def get_profile(self):
+        """
+        Waypoints of the loaded profile, or None
+        """
+        return self.__profile.get_waypoints() if self.__profile is not None else None
+
+    def run_heater(self, elapsed_ms):
+        """
+        Run the heater loop. Meant to be called on its own short fixed period
+        (independent of run()) with the milliseconds since the last call.
+
+        In "pid" mode and while active, the PID output is recomputed every
+        PID_PERIOD_MS and applied as the heater duty cycle. Otherwise, or on a
+        sensor error, the heater is kept off.
+        """
+        heater = self.__heater
+        if heater is None:
+            return
+
+        if not self.__is_active or self.__mode != "pid" or self.__sensor.has_error():
+            if heater.get_duty() or heater.is_on():
+                if round(heater.get_duty() * 100):
+                    self.__version += 1
+                heater.off()
+            self.__pid.reset()
+            self.__pid_elapsed = PID_PERIOD_MS  # compute right away on restart
+            return
+
+        self.__pid_elapsed += elapsed_ms
+        if self.__pid_elapsed >= PID_PERIOD_MS:
+            duty = round(heater.get_duty() * 100)
+            heater.set_duty(
+                self.__pid.update(
+                    self.__setpoint,
+                    self.__sensor.get_temperature(),
+                    self.__pid_elapsed / 1000,
+                )
+            )
+            self.__pid_elapsed = 0
+            if round(heater.get_duty() * 100) != duty:
+                self.__version += 1
+        heater.update(elapsed_ms)
+
     def stop(self):
         """
         Emergency stop the controller. Also stops all motors and the timer
@@ -61,20 +184,62 @@ class Controller:
 
     def get_config(self):
         """
-        Get the configuration of the controller in json format
+        Get the configuration of the controller in json format. Built once
+        per version: don't modify the returned dict.
         """
+        if self.__config_version != self.__version:
+            self.__config = self.__build_config()
+            self.__config_version = self.__version
+        return self.__config
+
+    def __build_config(self):
         return {
             "starting_temperature": self.__starting_temperature,
             "time": self.__time,
             "status": "on" if self.__is_active else "off",
+            "mode": self.__mode,
+            "setpoint": self.__setpoint,
+            "kp": self.__pid.kp,
+            "ki": self.__pid.ki,
+            "kd": self.__pid.kd,
+            "heater": round(self.__heater.get_duty() * 100) if self.__heater else 0,
+            "profile": self.__profile is not None,
         }
 
-    def set_config(self, starting_temperature, time):
+    def is_active(self):
+        return self.__is_active
+
+    def get_version(self):
+        """
+        Counter that changes whenever the configuration returned by
+        get_config() changes (settings, status, setpoint or heater duty)
+        """
+        return self.__version
+
+    def set_config(
+        self, starting_temperature, time, mode=None, setpoint=None, kp=None, ki=None, kd=None
+    ):
         """
         Set the configuration of the controller and return current config
         """
+        pid = self.__pid
+        old = (self.__starting_temperature, self.__time, self.__mode, self.__setpoint,
+               pid.kp, pid.ki, pid.kd)
         if starting_temperature is not None:
             self.__starting_temperature = starting_temperature
         if time is not None:
             self.__time = time
+        if mode is not None:
+            self.__mode = mode
+        if setpoint is not None:
+            self.__setpoint = setpoint
+        if kp is not None:
+            self.__pid.kp = kp
+        if ki is not None:
+            self.__pid.ki = ki
+        if kd is not None:
+            self.__pid.kd = kd
+        if (self.__starting_temperature, self.__time, self.__mode, self.__setpoint,
+                pid.kp, pid.ki, pid.kd) != old:
+            self.__version += 1
         return self.get_config()
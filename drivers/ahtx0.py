@@ -31,6 +31,8 @@ Author(s): Andreas Bühl, Kattni Rembor
 import utime
 from micropython import const
 
+from drivers.crc8 import crc8
+
 
 class AHT10:
     """Interface library for AHT10/AHT20 temperature+humidity sensors"""
@@ -41,12 +43,13 @@ class AHT10:
     AHTX0_CMD_SOFTRESET = const(0xBA)  # Soft reset command
     AHTX0_STATUS_BUSY = const(0x80)  # Status bit for busy
     AHTX0_STATUS_CALIBRATED = const(0x08)  # Status bit for calibrated
+    BUFFER_SIZE = 6  # status + 5 data bytes
 
     def __init__(self, i2c, address=AHTX0_I2CADDR_DEFAULT):
         utime.sleep_ms(20)  # 20ms delay to wake up
         self._i2c = i2c
         self._address = address
-        self._buf = bytearray(6)
+        self._buf = bytearray(self.BUFFER_SIZE)
         self.reset()
         if not self.initialize():
             raise RuntimeError("Could not initialize")
@@ -119,3 +122,10 @@ class AHT10:
 
 class AHT20(AHT10):
     AHTX0_CMD_INITIALIZE = 0xBE  # Calibration command
+    BUFFER_SIZE = 7  # status + 5 data bytes + CRC-8
+
+    def _perform_measurement(self):
+        """Trigger measurement, write result to buffer and check its CRC"""
+        super()._perform_measurement()
+        if crc8(self._buf, 0, 6) != self._buf[6]:
+            raise RuntimeError("AHT20 CRC error")
@@ -1,16 +1,38 @@
 import time
 
+# Hardware SPI host tried by make_spi() (ESP32: 1 = HSPI, 2 = VSPI). Any pins
+# can be routed to it; its default MOSI pin (GPIO 13 for HSPI) is claimed but
+# unused, the MAX6675 has no data input.
+SPI_ID = 1
+SPI_BAUDRATE = 4000000  # MAX6675 max SCK is 4.3MHz
+
+
+def make_spi(sck, so, spi_id=SPI_ID, baudrate=SPI_BAUDRATE):
+    """
+    Hardware SPI (mode 0) on the given SCK/SO pins, or None if this port has
+    no machine.SPI or the pins can't be routed to it.
+    """
+    try:
+        from machine import SPI
+
+        return SPI(spi_id, baudrate=baudrate, polarity=0, phase=0, sck=sck, miso=so)
+    except (ImportError, TypeError, ValueError, OSError):
+        return None
+
 
 class MAX6675:
     MEASUREMENT_PERIOD_MS = 220
 
-    def __init__(self, sck, cs, so):
+    def __init__(self, sck, cs, so, spi="auto"):
         """
         Creates new object for controlling MAX6675
 
         :param sck: SCK (clock) pin, must be configured as Pin.OUT
         :param cs: CS (select) pin, must be configured as Pin.OUT
         :param so: SO (data) pin, must be configured as Pin.IN
+        :param spi: "auto" to use hardware SPI when available (see make_spi),
+                    a machine.SPI / SoftSPI object on sck/so (mode 0), or None
+                    to bit-bang the pins
         """
         # Thermocouple
         self._sck = sck
@@ -22,8 +44,15 @@ class MAX6675:
         self._so = so
         self._so.off()
 
+        if spi == "auto":
+            spi = make_spi(sck, so)
+        self._spi = spi
+        self._buf = bytearray(2)
+        #: "spi" or "bitbang"
+        self.backend = "bitbang" if spi is None else "spi"
+
         self._last_measurement_start = 0
-        self._last_read_temp = 0
+        self._last_read_raw = 0
         self._error = 0
 
     def _cycle_sck(self):
@@ -72,36 +101,65 @@ class MAX6675:
         :return: Measured temperature
         :rtype: float
         """
+        return self.read_raw() * 0.25
+
+    def read_raw(self):
+        """
+        Same as `read`, but returns the raw 12-bit conversion (0.25 C per count).
+
+        :return: Measured temperature in quarter degrees
+        :rtype: int
+        """
         # Check if new reading is available
         if self.ready():
-            # Bring CS pin off to start protocol for reading result of
-            # the conversion process. Forcing the pin down outputs
-            # first (dummy) sign bit 15.
-            self._cs.off()
-            time.sleep_us(10)
-
-            # Read temperature bits 14-3 from MAX6675.
-            value = 0
-            for i in range(12):
-                # SCK should resemble clock signal and new SO value
-                # is presented at falling edge
-                self._cycle_sck()
-                value += self._so.value() << (11 - i)
-
-            # Read the TC Input pin to check if the input is open
-            self._cycle_sck()
-            self._error = self._so.value()
+            if self._spi is not None:
+                value = self._read_spi()
+            else:
+                value = self._read_bitbang()
             if self._error:
                 raise Exception("Thermocouple damaged or loosely connected")
+            self._last_read_raw = value
+
+        return self._last_read_raw
 
-            # Read the last two bits to complete protocol
-            for i in range(2):
-                self._cycle_sck()
+    def _read_spi(self):
+        # One 16-bit frame: dummy sign bit 15, temperature bits 14-3, the
+        # open-input bit 2, device ID and tri-state bits 1-0.
+        buf = self._buf
+        self._cs.off()
+        self._spi.readinto(buf)
+        self._cs.on()
+        self._last_measurement_start = time.ticks_ms()
+
+        frame = (buf[0] << 8) | buf[1]
+        self._error = (frame >> 2) & 1
+        return (frame >> 3) & 0xFFF
+
+    def _read_bitbang(self):
+        # Bring CS pin off to start protocol for reading result of
+        # the conversion process. Forcing the pin down outputs
+        # first (dummy) sign bit 15.
+        self._cs.off()
+        time.sleep_us(10)
+
+        # Read temperature bits 14-3 from MAX6675.
+        value = 0
+        for i in range(12):
+            # SCK should resemble clock signal and new SO value
+            # is presented at falling edge
+            self._cycle_sck()
+            value += self._so.value() << (11 - i)
 
-            # Finish protocol and start new measurement
-            self._cs.on()
-            self._last_measurement_start = time.ticks_ms()
+        # Read the TC Input pin to check if the input is open
+        self._cycle_sck()
+        self._error = self._so.value()
 
-            self._last_read_temp = value * 0.25
+        # Read the last two bits to complete protocol
+        for i in range(2):
+            self._cycle_sck()
 
-        return self._last_read_temp
+        # Finish protocol and start new measurement (also after an
+        # error, so CS isn't left low and the next read starts clean)
+        self._cs.on()
+        self._last_measurement_start = time.ticks_ms()
+        return value
@@ -1,29 +1,37 @@
 import time
 
+from drivers.crc8 import check_frame
+
 
 class SHT31:
     """Minimal Sensirion SHT31 driver (single-shot, clock stretching disabled)."""
 
+    MEASUREMENT_PERIOD_MS = 16  # high-repeatability conversion, 15.5ms max
+
     def __init__(self, i2c, addr=0x44):
         self._i2c = i2c
         self._addr = addr
+        self._buf = bytearray(6)
+        self._triggered_at = 0
         # Presence check: raises (ENODEV / CRC) if the sensor isn't responding.
         self.measure()
 
-    def _crc(self, data):
-        crc = 0xFF
-        for b in data:
-            crc ^= b
-            for _ in range(8):
-                crc = ((crc << 1) ^ 0x31) & 0xFF if (crc & 0x80) else (crc << 1) & 0xFF
-        return crc
-
-    def measure(self):
-        """Return (temperature_C, humidity_pct). Raises on I2C or CRC error."""
+    def trigger(self):
+        """Start a single-shot conversion (~15ms); collect it with fetch()."""
         self._i2c.writeto(self._addr, b"\x24\x00")  # high repeatability, no clock stretch
-        time.sleep_ms(20)                            # high-rep conversion ~15ms
-        d = self._i2c.readfrom(self._addr, 6)
-        if self._crc(d[0:2]) != d[2] or self._crc(d[3:5]) != d[5]:
+        self._triggered_at = time.ticks_ms()
+
+    def ready(self):
+        """True once the conversion started by trigger() is done."""
+        return time.ticks_diff(time.ticks_ms(), self._triggered_at) >= SHT31.MEASUREMENT_PERIOD_MS
+
+    def fetch(self):
+        """Return (temperature_C, humidity_pct) of the conversion started by
+        trigger(). The sensor NACKs (OSError) until the conversion is done.
+        Raises on I2C or CRC error."""
+        d = self._buf
+        self._i2c.readfrom_into(self._addr, d)
+        if not check_frame(d):
             raise Exception("SHT31 CRC error")
         t_raw = (d[0] << 8) | d[1]
         h_raw = (d[3] << 8) | d[4]
@@ -31,6 +39,12 @@ class SHT31:
         hum = 100 * h_raw / 65535
         return temp, hum
 
+    def measure(self):
+        """Blocking trigger() + fetch(): return (temperature_C, humidity_pct)."""
+        self.trigger()
+        time.sleep_ms(20)                            # high-rep conversion ~15ms
+        return self.fetch()
+
     def heater(self, on):
         """Toggle the on-chip heater to burn off condensation / oils."""
         self._i2c.writeto(self._addr, b"\x30\x6d" if on else b"\x30\x66")
@@ -0,0 +1,199 @@
+import asyncio
+import json
+import os
+from binascii import crc32
+
+CHUNK_SIZE = 128  # read-back buffer used to verify a write
+RETRY_MS = 5000  # wait before retrying a failed write
+
+
+class ConfigStore:
+    def __init__(self, path="config.json", debounce_ms=500, logger=None):
+        """
+        Saved roasting presets, loaded once and kept in RAM
+
+        Reads never touch flash. Changes are written by run() once no other
+        change has come in for `debounce_ms`, so a burst of edits costs one
+        write: the JSON goes to `path`.tmp, is read back and checked against
+        the CRC-32 of what was written, and only then renamed over `path`.
+        A power cut leaves either the old file or the new one, never half of
+        each: on FAT, which can't rename over a file, `path` is removed first,
+        and load() falls back to a complete `path`.tmp if `path` is missing.
+        A file that can't be parsed at boot is moved to `path`.bad instead of
+        being overwritten by the next save. A failed write is retried every
+        RETRY_MS until it works.
+
+        etag() changes with every change: the CRC-32 of the loaded file plus
+        a version counter.
+
+        :param path: JSON file, an object of preset name -> preset
+        :param debounce_ms: quiet time before a change is written
+        :param logger: SimpleLogger for load/write errors (None to disable)
+        """
+        self.__path = path
+        self.__debounce_ms = debounce_ms
+        self.__logger = logger
+        self.__configs = {}
+        self.__base = 0
+        self.__version = 0
+        self.__saved_version = 0
+        self.__json = None  # serialized __configs, valid for __json_version
+        self.__json_version = -1
+        self.__changed = asyncio.Event()
+        self.load()
+
+    def load(self):
+        """
+        (Re)read the file, dropping unsaved changes
+        """
+        try:
+            with open(self.__path, "rb") as f:
+                data = f.read()
+        except OSError:
+            data = self.__recover()
+        try:
+            configs = json.loads(data)
+            if not isinstance(configs, dict):
+                raise ValueError("not an object")
+        except ValueError as e:
+            self.__log(f"{self.__path} is corrupt ({e}), moved to {self.__path}.bad")
+            try:
+                os.rename(self.__path, self.__path + ".bad")
+            except OSError:
+                pass
+            configs = {}
+            data = b"{}"
+        self.__configs = configs
+        self.__base = crc32(data)
+        self.__version = self.__saved_version = 0
+        self.__json = None
+        self.__json_version = -1
+
+    def __recover(self):
+        # `path` is missing: a power cut between the remove and the rename of
+        # a FAT flush() leaves only the verified `path`.tmp
+        tmp = self.__path + ".tmp"
+        try:
+            with open(tmp, "rb") as f:
+                data = f.read()
+            if not isinstance(json.loads(data), dict):
+                return b"{}"
+        except (OSError, ValueError):
+            return b"{}"  # no presets saved yet
+        try:
+            os.rename(tmp, self.__path)
+        except OSError:
+            pass  # still loaded; the next flush() writes `path`
+        self.__log(f"{self.__path} was missing, recovered from {tmp}")
+        return data
+
+    def get_all(self):
+        """
+        All presets, name -> preset. Don't modify the returned dict.
+        """
+        return self.__configs
+
+    def get(self, name):
+        return self.__configs.get(name)
+
+    def __contains__(self, name):
+        return name in self.__configs
+
+    def put(self, name, config):
+        """
+        Add or replace a preset; written after the debounce delay
+        """
+        self.__configs[name] = config
+        self.__touch()
+
+    def remove(self, name):
+        """
+        Delete a preset; written after the debounce delay
+
+        :raises KeyError: if there is no preset called `name`
+        """
+        del self.__configs[name]
+        self.__touch()
+
+    def __touch(self):
+        self.__version += 1
+        self.__changed.set()
+
+    def dumps(self):
+        """
+        The presets as JSON bytes, serialized once per change
+        """
+        if self.__json_version != self.__version:
+            self.__json = json.dumps(self.__configs).encode()
+            self.__json_version = self.__version
+        return self.__json
+
+    def etag(self):
+        return '"{:08x}-{}"'.format(self.__base, self.__version)
+
+    def dirty(self):
+        """
+        True if there are changes not written to flash yet
+        """
+        return self.__saved_version != self.__version
+
+    def flush(self):
+        """
+        Write pending changes now (also called by run())
+
+        :return: True if the file is up to date
+        """
+        if not self.dirty():
+            return True
+        version = self.__version
+        data = self.dumps()
+        tmp = self.__path + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            if self.__checksum(tmp) != crc32(data):
+                raise OSError("checksum mismatch")
+            try:
+                os.rename(tmp, self.__path)
+            except OSError:
+                # FAT can't rename over an existing file
+                os.remove(self.__path)
+                os.rename(tmp, self.__path)
+        except OSError as e:
+            self.__log(f"Failed to write {self.__path}: {e}")
+            return False
+        self.__saved_version = version
+        return True
+
+    @staticmethod
+    def __checksum(path):
+        buf = bytearray(CHUNK_SIZE)
+        mv = memoryview(buf)
+        crc = 0
+        with open(path, "rb") as f:
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    return crc
+                crc = crc32(mv[:n], crc)
+
+    async def run(self):
+        """
+        Writer task: flush once changes stop coming for `debounce_ms`
+        """
+        while True:
+            await self.__changed.wait()
+            self.__changed.clear()
+            version = self.__version
+            while True:
+                await asyncio.sleep(self.__debounce_ms / 1000)
+                if self.__version == version:
+                    break
+                version = self.__version  # still being edited
+            if not self.flush():
+                await asyncio.sleep(RETRY_MS / 1000)
+                self.__changed.set()  # try again
+
+    def __log(self, message):
+        if self.__logger is not None:
+            self.__logger.error(message)
@@ -0,0 +1,136 @@
+import gc
+import time
+
+try:
+    import esp32
+except ImportError:  # not an ESP32 port (e.g. the simulator)
+    esp32 = None
+
+
+class GcPolicy:
+    def __init__(self, collect_pct=50, threshold_pct=40):
+        """
+        Heap collection only when the heap needs it, in the idle gap after a
+        logic_loop tick
+
+        tick() runs as the last logic_loop job, right before the loop sleeps
+        for the rest of the second, and collects only once gc.mem_alloc() is
+        past `collect_pct` of the heap instead of every tick. gc.threshold()
+        is set so that a burst of allocations between ticks (e.g. a /history
+        download) still triggers an automatic collection before the heap
+        fills up.
+
+        Each collection's duration is recorded, and so is the largest free
+        block of the ESP-IDF heap afterwards (where socket buffers and the
+        grown MicroPython heap come from): MicroPython doesn't expose the
+        largest free block of its own heap.
+
+        Without gc.mem_alloc() (CPython), every tick collects, as before.
+
+        :param collect_pct: heap use (%) from which tick() collects
+        :param threshold_pct: heap share (%) allocated since the last
+                              collection that triggers an automatic one
+        """
+        self.__collect_pct = collect_pct
+        self.__threshold = None
+        if hasattr(gc, "mem_alloc"):
+            self.__threshold = (gc.mem_alloc() + gc.mem_free()) * threshold_pct // 100
+            gc.threshold(self.__threshold)
+        self.reset()
+
+    def reset(self):
+        """
+        Clear the collection counters
+        """
+        self.__collections = 0
+        self.__skipped = 0
+        self.__total_us = 0
+        self.__max_us = 0
+        self.__last_us = 0
+        self.__last_freed = 0
+        self.__largest_free_min = None
+
+    def due(self):
+        """
+        True if heap use is past `collect_pct`
+        """
+        if self.__threshold is None:
+            return True
+        alloc = gc.mem_alloc()
+        return alloc * 100 >= (alloc + gc.mem_free()) * self.__collect_pct
+
+    def tick(self):
+        """
+        Scheduler job: collect if due()
+        """
+        if self.due():
+            self.collect()
+        else:
+            self.__skipped += 1
+
+    def collect(self):
+        """
+        Collect now and record how long it took and what it freed
+        """
+        before = gc.mem_alloc() if self.__threshold is not None else 0
+        t = time.ticks_us()
+        gc.collect()
+        us = time.ticks_diff(time.ticks_us(), t)
+
+        self.__collections += 1
+        self.__total_us += us
+        self.__last_us = us
+        if us > self.__max_us:
+            self.__max_us = us
+        if self.__threshold is not None:
+            self.__last_freed = before - gc.mem_alloc()
+
+        largest = self.__idf_heap()[1]
+        if largest is not None and (
+            self.__largest_free_min is None or largest < self.__largest_free_min
+        ):
+            self.__largest_free_min = largest
+
+    @staticmethod
+    def __idf_heap():
+        # (free bytes, largest free block) of the ESP-IDF data heap
+        if esp32 is None:
+            return None, None
+        free = 0
+        largest = 0
+        for _, region_free, region_largest, _ in esp32.idf_heap_info(esp32.HEAP_DATA):
+            free += region_free
+            if region_largest > largest:
+                largest = region_largest
+        return free, largest
+
+    def get_json(self):
+        alloc = free = None
+        if self.__threshold is not None:
+            alloc = gc.mem_alloc()
+            free = gc.mem_free()
+        idf_free, largest = self.__idf_heap()
+        count = self.__collections
+        return {
+            "heap": {
+                "alloc_bytes": alloc,
+                "free_bytes": free,
+                "threshold_bytes": self.__threshold,
+            },
+            "idf_heap": {
+                "free_bytes": idf_free,
+                "largest_free_bytes": largest,
+                "largest_free_min_bytes": self.__largest_free_min,
+                "fragmentation_pct": (
+                    round(100 - largest * 100 / idf_free, 1) if idf_free else None
+                ),
+            },
+            "collections": {
+                "count": count,
+                "skipped": self.__skipped,
+                "avg_us": self.__total_us // count if count else 0,
+                "max_us": self.__max_us,
+                "last_us": self.__last_us,
+                "last_freed_bytes": self.__last_freed,
+            },
+        }
@@ -0,0 +1,64 @@
+class HeaterController:
+    def __init__(self, pin, window_ms=2000, min_switch_ms=100):
+        """
+        Drive a heater/burner relay with time-proportioned PWM
+
+        The duty cycle (0-1) is turned into the relay being on for the first
+        `duty * window_ms` of every window. Pulses shorter than `min_switch_ms`
+        are skipped (or stretched to a full window) to spare the relay.
+
+        :param pin: relay pin, configured as Pin.OUT
+        :param window_ms: PWM window length
+        :param min_switch_ms: shortest on/off pulse
+        """
+        self.__pin = pin
+        self.__window_ms = window_ms
+        self.__min_switch_ms = min_switch_ms
+
+        self.__duty = 0.0
+        self.__on_ms = 0
+        self.__position = 0
+        self.__is_on = False
+        self.__pin.off()
+
+    def set_duty(self, duty):
+        """
+        Set the duty cycle, from 0 (off) to 1 (always on). Applied from the
+        next window.
+        """
+        self.__duty = min(max(duty, 0.0), 1.0)
+
+    def update(self, elapsed_ms):
+        """
+        Advance the PWM by `elapsed_ms` and switch the relay. Call on a short
+        fixed period (a fraction of the window).
+        """
+        self.__position += elapsed_ms
+        if self.__position >= self.__window_ms:
+            self.__position %= self.__window_ms
+            on_ms = int(self.__duty * self.__window_ms)
+            if on_ms < self.__min_switch_ms:
+                on_ms = 0
+            elif self.__window_ms - on_ms < self.__min_switch_ms:
+                on_ms = self.__window_ms
+            self.__on_ms = on_ms
+
+        on = self.__position < self.__on_ms
+        if on != self.__is_on:
+            self.__pin.on() if on else self.__pin.off()
+            self.__is_on = on
+
+    def off(self):
+        """
+        Turn the heater off immediately
+        """
+        self.__duty = 0.0
+        self.__on_ms = 0
+        self.__pin.off()
+        self.__is_on = False
+
+    def get_duty(self):
+        return self.__duty
+
+    def is_on(self):
+        return self.__is_on
@@ -0,0 +1,144 @@
+from lib.recorder import FIELDS, SCALES
+
+FORMATS = ("csv", "ndjson")
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=UTF-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Rows are sent in batches so each socket write carries more than one line
+ROWS_PER_CHUNK = 32
+
+
+def parse_fields(spec):
+    """
+    Turn a comma separated field list into record indexes (`t` always first).
+    Raises ValueError on an unknown field.
+    """
+    if not spec:
+        return tuple(range(len(FIELDS)))
+    idx = [0]
+    for name in spec.split(","):
+        name = name.strip()
+        if name == "t":
+            continue
+        if name not in FIELDS:
+            raise ValueError(f"unknown field '{name}'")
+        i = FIELDS.index(name)
+        if i not in idx:
+            idx.append(i)
+    return tuple(idx)
+
+
+def _scaled(v, i):
+    return v if SCALES[i] == 1 else v / SCALES[i]
+
+
+def _value(rec, i):
+    return _scaled(rec[i], i)
+
+
+def _every(records, n):
+    k = 0
+    for rec in records:
+        if k % n == 0:
+            yield rec
+        k += 1
+
+
+def _header(idx, fmt, minmax):
+    if fmt != "csv":
+        return None
+    names = []
+    for i in idx:
+        if minmax and i != 0:
+            names.append(FIELDS[i] + "_min")
+            names.append(FIELDS[i] + "_max")
+        else:
+            names.append(FIELDS[i])
+    return ",".join(names) + "\n"
+
+
+def _row(rec, idx, fmt):
+    if fmt == "csv":
+        return ",".join([str(_value(rec, i)) for i in idx]) + "\n"
+    return "{" + ",".join(['"{}":{}'.format(FIELDS[i], _value(rec, i)) for i in idx]) + "}\n"
+
+
+def _bucket_row(t, lo, hi, idx, fmt):
+    if fmt == "csv":
+        cols = [str(t)]
+        for k in range(1, len(idx)):
+            cols.append(str(_scaled(lo[k], idx[k])))
+            cols.append(str(_scaled(hi[k], idx[k])))
+        return ",".join(cols) + "\n"
+    cols = ['"t":{}'.format(t)]
+    for k in range(1, len(idx)):
+        i = idx[k]
+        cols.append('"{}":[{},{}]'.format(FIELDS[i], _scaled(lo[k], i), _scaled(hi[k], i)))
+    return "{" + ",".join(cols) + "}\n"
+
+
+def _buckets(records, idx, seconds, fmt):
+    """
+    Min/max of every selected field over consecutive `seconds`-long windows,
+    one row per window (labelled with the window start).
+    """
+    start = None
+    lo = hi = None
+    for rec in records:
+        b = rec[0] - rec[0] % seconds
+        if b != start:
+            if start is not None:
+                yield _bucket_row(start, lo, hi, idx, fmt)
+            start = b
+            lo = [rec[i] for i in idx]
+            hi = list(lo)
+            continue
+        for k in range(1, len(idx)):
+            v = rec[idx[k]]
+            if v < lo[k]:
+                lo[k] = v
+            elif v > hi[k]:
+                hi[k] = v
+    if start is not None:
+        yield _bucket_row(start, lo, hi, idx, fmt)
+
+
+def history_body(records, idx, fmt="csv", every=1, bucket=0):
+    """
+    Generator producing the response body for a roast history query in text
+    chunks, so the curve is streamed instead of built in RAM.
+
+    :param records: raw records, e.g. from RoastRecorder.records()
+    :param idx: record indexes to send, from parse_fields()
+    :param fmt: "csv" or "ndjson"
+    :param every: keep only every Nth record
+    :param bucket: if > 0, send min/max per `bucket` seconds instead of points
+    """
+    source = records
+    if every > 1:
+        records = _every(records, every)
+    if bucket > 0:
+        rows = _buckets(records, idx, bucket, fmt)
+    else:
+        rows = (_row(rec, idx, fmt) for rec in records)
+
+    try:
+        chunk = []
+        header = _header(idx, fmt, bucket > 0)
+        if header:
+            chunk.append(header)
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= ROWS_PER_CHUNK:
+                yield "".join(chunk)
+                chunk = []
+        if chunk:
+            yield "".join(chunk)
+    finally:
+        # A client that disconnects only closes this generator: close the
+        # records generator too, so its file is closed now and not at the
+        # next collection (MicroPython has no generator finalizers)
+        if hasattr(source, "close"):
+            source.close()
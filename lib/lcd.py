@@ -1,3 +1,4 @@
+import asyncio
 import time
 import machine
 from drivers.machine_i2c_lcd import I2cLcd
@@ -11,76 +12,217 @@ def _pad(s, width):
     return s + " " * n if n > 0 else s
 
 
+# Unchanged characters between two changed runs that are rewritten anyway to
+# merge them: one padded character (5 bytes) is cheaper than another cursor
+# move (5 bytes) plus an I2C start, address and stop.
+MAX_GAP = 1
+
+# Longest time without a bus write: a frame that doesn't change sends nothing,
+# so a cursor move (5 bytes) is sent to notice an unplugged display
+HEARTBEAT_MS = 5000
+
+
 class LcdController:
-    def __init__(self, LCD_SDA, LCD_SCL):
+    def __init__(self, LCD_SDA, LCD_SCL, min_backoff_ms=1000, max_backoff_ms=60000):
+        """
+        2x16 I2C LCD, drawn by its own task
+
+        show_data() and show_ip() only leave the latest values in a
+        single-slot mailbox (a newer update replaces one not drawn yet);
+        run() draws them, yielding between rows, so a slow or missing display
+        never delays logic_loop.
+
+        When a write fails the display is dropped and re-probed (full init)
+        after `min_backoff_ms`, doubling the wait after every failed probe up
+        to `max_backoff_ms`: a display plugged in later comes back without a
+        reboot, and a missing one costs one failed write per minute. If
+        nothing was written for HEARTBEAT_MS a cursor move is sent, so an
+        unplugged display is noticed even when the text doesn't change.
+
+        :param min_backoff_ms: wait before the first re-probe
+        :param max_backoff_ms: longest wait between re-probes
+        """
         self.__I2C_ADDR = 0x27
         self.__I2C_NUM_ROWS = 2
         self.__I2C_NUM_COLS = 16
 
         self.__i2c = machine.I2C(1, sda=LCD_SDA, scl=LCD_SCL, freq=400000)
-        self.__lcd = I2cLcd(
-            self.__i2c, self.__I2C_ADDR, self.__I2C_NUM_ROWS, self.__I2C_NUM_COLS
-        )
+        self.__lcd = None
+        self.__error = None
+        self.__min_backoff_ms = min_backoff_ms
+        self.__max_backoff_ms = max_backoff_ms
+        self.__backoff_ms = min_backoff_ms
+        self.__written_at = 0
 
-        self.__last_line0 = None
-        self.__last_line1 = None
+        # What the display shows, one bytearray per row
+        self.__frame = [
+            bytearray(b" " * self.__I2C_NUM_COLS) for _ in range(self.__I2C_NUM_ROWS)
+        ]
+        self.__data = None  # mailbox: (temperature, humidity, time_in_seconds)
+        self.__posted = asyncio.Event()
         self.__ip_override = None
         self.__ip_override_until = 0
-        self.__error_logged = False
+        self.probe()
+
+    def probe(self):
+        """
+        (Re)initialize the display
+
+        :return: True if it answered
+        """
+        try:
+            self.__lcd = I2cLcd(
+                self.__i2c, self.__I2C_ADDR, self.__I2C_NUM_ROWS, self.__I2C_NUM_COLS
+            )
+        except Exception as e:
+            self.__lcd = None
+            self.__error = e
+            return False
+        self.__fill(0x20)  # the init cleared it
+        self.__written_at = time.ticks_ms()
+        self.__error = None
+        self.__backoff_ms = self.__min_backoff_ms
+        return True
+
+    def connected(self):
+        """
+        True if the last write (or probe) worked
+        """
+        return self.__lcd is not None
+
+    def get_error(self):
+        """
+        Exception that dropped the display, or None while it is connected
+        """
+        return self.__error
 
     def clear(self):
-        self.__lcd.clear()
-        self.__last_line0 = None
-        self.__last_line1 = None
+        self.__data = None
         self.__ip_override = None
+        if self.__lcd is None:
+            return
+        try:
+            self.__lcd.clear()
+            self.__fill(0x20)
+        except Exception as e:
+            self.__drop(e)
 
     def show_ip(self, ip_str):
         """
         Show IP on 2nd row for 5 seconds, then resume normal display.
-        Non-blocking — the override expires automatically in show_data().
+        Non-blocking — drawn by run(), the override expires by itself.
         """
-        try:
-            self.__ip_override = _pad(ip_str, self.__I2C_NUM_COLS)
-            self.__ip_override_until = time.ticks_add(time.ticks_ms(), 5000)
-            self.__lcd.move_to(0, 1)
-            self.__lcd.putstr(self.__ip_override)
-            self.__last_line1 = self.__ip_override
-        except Exception as e:
-            if not self.__error_logged:
-                print(f"LCD error: {e}")
-                self.__error_logged = True
+        self.__ip_override = _pad(ip_str, self.__I2C_NUM_COLS)
+        self.__ip_override_until = time.ticks_add(time.ticks_ms(), 5000)
+        self.__posted.set()
 
     def show_data(self, temperature, humidity, time_in_seconds):
         """
-        Write sensor data and time to the LCD
+        Post sensor data and time for run() to draw. Non-blocking.
+        """
+        self.__data = (temperature, humidity, time_in_seconds)
+        self.__posted.set()
+
+    async def run(self, timing=None):
         """
+        LCD task: draw the latest update, re-probe while the display is missing
+
+        :param timing: optional TimingMonitor, each row drawn is recorded as "lcd"
+        """
+        while True:
+            if self.__lcd is None:
+                await asyncio.sleep(self.__backoff_ms / 1000)
+                if not self.probe():
+                    self.__backoff_ms = min(self.__backoff_ms * 2, self.__max_backoff_ms)
+                    continue
+                print("LCD reconnected")  # redraw the latest update right away
+            else:
+                await self.__wait()
+            self.__posted.clear()
+            await self.__draw(timing)
+
+    async def __wait(self):
+        # Wait for an update, or until the IP override expires: updates are
+        # only posted when the data changes
+        if self.__ip_override is None:
+            await self.__posted.wait()
+            return
+        ms = time.ticks_diff(self.__ip_override_until, time.ticks_ms())
         try:
-            line0 = _pad(f"T: {temperature}C H: {humidity}%", self.__I2C_NUM_COLS)
-
-            if self.__ip_override is not None:
-                if time.ticks_diff(self.__ip_override_until, time.ticks_ms()) > 0:
-                    line1 = self.__ip_override
-                else:
-                    self.__ip_override = None
-                    self.__last_line1 = None
-                    line1 = _pad(format_time(time_in_seconds), self.__I2C_NUM_COLS)
+            await asyncio.wait_for(self.__posted.wait(), max(ms, 0) / 1000)
+        except asyncio.TimeoutError:
+            pass
+
+    async def __draw(self, timing):
+        lines = self.__lines()
+        for row in range(self.__I2C_NUM_ROWS):
+            if lines[row] is None:
+                continue
+            t = timing.start() if timing is not None else 0
+            try:
+                self.__render(row, lines[row])
+            except Exception as e:
+                self.__drop(e)
+                return
+            if timing is not None:
+                timing.stop("lcd", t)
+            await asyncio.sleep(0)
+        idle_ms = time.ticks_diff(time.ticks_ms(), self.__written_at)
+        if self.__lcd is not None and idle_ms >= HEARTBEAT_MS:
+            try:
+                self.__lcd.write_at(0, 0, b"", 0, 0)
+                self.__written_at = time.ticks_ms()
+            except Exception as e:
+                self.__drop(e)
+
+    def __lines(self):
+        # Row texts for the mailbox contents, None for a row with nothing to show
+        line0 = line1 = None
+        if self.__data is not None:
+            temperature, humidity, time_in_seconds = self.__data
+            line0 = f"T: {temperature}C H: {humidity}%"
+            line1 = format_time(time_in_seconds)
+        if self.__ip_override is not None:
+            if time.ticks_diff(self.__ip_override_until, time.ticks_ms()) > 0:
+                line1 = self.__ip_override
             else:
-                line1 = _pad(format_time(time_in_seconds), self.__I2C_NUM_COLS)
+                self.__ip_override = None
+        return line0, line1
 
-            if line0 != self.__last_line0:
-                self.__lcd.move_to(0, 0)
-                self.__lcd.putstr(line0)
-                self.__last_line0 = line0
+    def __drop(self, e):
+        # A failed write leaves the display state unknown: re-probe with a
+        # full init, which also clears it
+        self.__lcd = None
+        self.__error = e
+        self.__backoff_ms = self.__min_backoff_ms
+        print(f"LCD error: {e}")
 
-            if line1 != self.__last_line1:
-                self.__lcd.move_to(0, 1)
-                self.__lcd.putstr(line1)
-                self.__last_line1 = line1
+    def __fill(self, value):
+        for row in self.__frame:
+            for i in range(len(row)):
+                row[i] = value
 
-            if self.__error_logged:
-                print("LCD reconnected")
-                self.__error_logged = False
-        except Exception as e:
-            if not self.__error_logged:
-                print(f"LCD error: {e}")
-                self.__error_logged = True
+    def __render(self, row, line):
+        """
+        Diff a line against the frame and write only the changed runs, one
+        I2C transaction each
+        """
+        cols = self.__I2C_NUM_COLS
+        data = _pad(line, cols).encode()
+        shadow = self.__frame[row]
+        col = 0
+        while col < cols:
+            if data[col] == shadow[col]:
+                col += 1
+                continue
+            start = col
+            end = col + 1
+            for j in range(col + 1, cols):
+                if data[j] != shadow[j]:
+                    end = j + 1
+                elif j - end >= MAX_GAP:
+                    break
+            self.__lcd.write_at(start, row, data, start, end)
+            self.__written_at = time.ticks_ms()
+            shadow[start:end] = data[start:end]
+            col = end
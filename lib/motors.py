@@ -11,62 +11,102 @@ class MotorController:
         self.__motor_b_is_active = False
         self.__motor_c_is_active = False
 
+        # Bumped whenever get_json() would return something different
+        self.__version = 0
+        self.__json = None  # get_json() result, valid for __json_version
+        self.__json_version = -1
+
     def read_motor_states(self):
         """
         Read the state of the motors and update the internal state
         """
+        mask = self.get_mask()
         self.__motor_a_is_active = bool(self.__motor_a.value())
         self.__motor_b_is_active = bool(self.__motor_b.value())
         self.__motor_c_is_active = bool(self.__motor_c.value())
+        if self.get_mask() != mask:
+            self.__version += 1
 
     def get_json(self):
         """
-        Get the state of the motors in json format
+        Get the state of the motors in json format. Built once per version:
+        don't modify the returned dict.
+        """
+        if self.__json_version != self.__version:
+            self.__json = {
+                "motor_a": self.__motor_a_is_active,
+                "motor_b": self.__motor_b_is_active,
+                "motor_c": self.__motor_c_is_active,
+            }
+            self.__json_version = self.__version
+        return self.__json
+
+    def get_version(self):
+        """
+        Counter that changes whenever get_json() changes
         """
-        return {
-            "motor_a": self.__motor_a_is_active,
-            "motor_b": self.__motor_b_is_active,
-            "motor_c": self.__motor_c_is_active,
-        }
+        return self.__version
+
+    def get_mask(self):
+        """
+        Get the state of the motors as a bitmask (bit 0: A, bit 1: B, bit 2: C)
+        """
+        return (
+            self.__motor_a_is_active
+            | self.__motor_b_is_active << 1
+            | self.__motor_c_is_active << 2
+        )
 
     def start_motor_a(self):
         """
         Start motor A
         """
         self.__motor_a.on()
-        self.__motor_a_is_active = True
+        if not self.__motor_a_is_active:
+            self.__motor_a_is_active = True
+            self.__version += 1
 
     def stop_motor_a(self):
         """
         Stop motor A
         """
         self.__motor_a.off()
-        self.__motor_a_is_active = False
+        if self.__motor_a_is_active:
+            self.__motor_a_is_active = False
+            self.__version += 1
 
     def start_motor_b(self):
         """
         Start motor B
         """
         self.__motor_b.on()
-        self.__motor_b_is_active = True
+        if not self.__motor_b_is_active:
+            self.__motor_b_is_active = True
+            self.__version += 1
 
     def stop_motor_b(self):
         """
         Stop motor B
         """
         self.__motor_b.off()
-        self.__motor_b_is_active = False
+        if self.__motor_b_is_active:
+            self.__motor_b_is_active = False
+            self.__version += 1
 
     def start_motor_c(self):
         """
         Start motor C
         """
         self.__motor_c.on()
-        self.__motor_c_is_active = True
+        if not self.__motor_c_is_active:
+            self.__motor_c_is_active = True
+            self.__version += 1
 
     def stop_motor_c(self):
         """
         Stop motor C
         """
         self.__motor_c.off()
-        self.__motor_c_is_active = False
+        if self.__motor_c_is_active:
+            self.__motor_c_is_active = False
+            self.__version += 1
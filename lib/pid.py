@@ -0,0 +1,52 @@
+class PID:
+    def __init__(self, kp, ki, kd, out_min=0.0, out_max=1.0):
+        """
+        PID controller with anti-windup and derivative on measurement
+
+        :param kp: proportional gain (output per degree of error)
+        :param ki: integral gain (output per degree-second)
+        :param kd: derivative gain (output per degree/second)
+        :param out_min: lowest output
+        :param out_max: highest output
+        """
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.out_min = out_min
+        self.out_max = out_max
+        self.reset()
+
+    def reset(self):
+        """
+        Clear the integral and derivative history (bumpless restart)
+        """
+        self.__integral = 0.0
+        self.__last = None
+
+    def update(self, setpoint, measurement, dt):
+        """
+        Compute the next output
+
+        :param setpoint: target value
+        :param measurement: current value
+        :param dt: seconds since the previous update
+        """
+        error = setpoint - measurement
+        p = self.kp * error
+
+        # Derivative on measurement: a setpoint step doesn't kick the output
+        d = 0.0
+        if self.__last is not None and dt > 0:
+            d = -self.kd * (measurement - self.__last) / dt
+        self.__last = measurement
+
+        # Anti-windup: only integrate while it doesn't push an already
+        # saturated output further, and keep the term itself within limits.
+        integral = self.__integral + self.ki * error * dt
+        out = p + integral + d
+        if (out > self.out_max and error > 0) or (out < self.out_min and error < 0):
+            integral = self.__integral
+        self.__integral = min(max(integral, self.out_min), self.out_max)
+
+        out = p + self.__integral + d
+        return min(max(out, self.out_min), self.out_max)
@@ -0,0 +1,112 @@
+from array import array
+
+MOTORS = ("motor_a", "motor_b", "motor_c")
+MAX_WAYPOINTS = 32
+MAX_TEMPERATURE = 400
+
+
+class RoastProfile:
+    def __init__(self, waypoints):
+        """
+        A roast profile compiled from a list of waypoints:
+
+            [{"time": 0, "temperature": 150},
+             {"time": 240, "temperature": 190, "motors": {"motor_a": True}},
+             {"time": 600, "temperature": 215, "motors": {"motor_b": True}}]
+
+        `time` is seconds since the controller was activated and must strictly
+        increase. The setpoint is interpolated linearly between waypoints and
+        holds the last temperature after the end. `motors` is an optional event
+        marker fired once when its time is reached.
+
+        Everything is validated here, once; the per-tick lookups only advance
+        cursors over the precompiled arrays.
+
+        :raises ValueError: if the waypoints are invalid
+        """
+        if not isinstance(waypoints, list) or not waypoints:
+            raise ValueError("'profile' must be a non-empty list")
+        if len(waypoints) > MAX_WAYPOINTS:
+            raise ValueError(f"'profile' must have at most {MAX_WAYPOINTS} waypoints")
+
+        self.__times = array("l")
+        self.__temps = array("f")
+        self.__event_times = array("l")
+        self.__event_masks = array("B")   # which motors the event sets
+        self.__event_states = array("B")  # on (1) / off (0) for each of them
+
+        last = -1
+        for i, wp in enumerate(waypoints):
+            if not isinstance(wp, dict):
+                raise ValueError(f"waypoint {i} must be an object")
+            t = wp.get("time")
+            temp = wp.get("temperature")
+            motors = wp.get("motors")
+            if not isinstance(t, int) or isinstance(t, bool) or t <= last:
+                raise ValueError(f"waypoint {i}: 'time' must be an integer greater than the previous one")
+            if not isinstance(temp, (int, float)) or isinstance(temp, bool) or not 0 <= temp <= MAX_TEMPERATURE:
+                raise ValueError(f"waypoint {i}: 'temperature' must be a number between 0 and {MAX_TEMPERATURE}")
+            self.__times.append(t)
+            self.__temps.append(temp)
+            last = t
+
+            if motors is None:
+                continue
+            if not isinstance(motors, dict) or not motors:
+                raise ValueError(f"waypoint {i}: 'motors' must be a non-empty object")
+            mask = 0
+            states = 0
+            for name, on in motors.items():
+                if name not in MOTORS or not isinstance(on, bool):
+                    raise ValueError(f"waypoint {i}: 'motors' keys must be in {list(MOTORS)} with boolean values")
+                bit = 1 << MOTORS.index(name)
+                mask |= bit
+                if on:
+                    states |= bit
+            self.__event_times.append(t)
+            self.__event_masks.append(mask)
+            self.__event_states.append(states)
+
+        self.__waypoints = waypoints
+        self.reset()
+
+    def reset(self):
+        """
+        Rewind to the start of the profile
+        """
+        self.__cursor = 0
+        self.__event_cursor = 0
+
+    def get_waypoints(self):
+        return self.__waypoints
+
+    def get_duration(self):
+        return self.__times[-1]
+
+    def setpoint(self, t):
+        """
+        Target temperature at `t` seconds. `t` must not go backwards between
+        calls (use reset() to restart).
+        """
+        times = self.__times
+        temps = self.__temps
+        last = len(times) - 1
+        while self.__cursor < last and times[self.__cursor + 1] <= t:
+            self.__cursor += 1
+
+        i = self.__cursor
+        if i == last or t <= times[i]:
+            return temps[i]
+        t0 = times[i]
+        return temps[i] + (temps[i + 1] - temps[i]) * (t - t0) / (times[i + 1] - t0)
+
+    def next_event(self, t):
+        """
+        Pop the next motor event due at `t`, as (mask, states) bitmasks
+        (bit 0: A, bit 1: B, bit 2: C), or None when none is due.
+        """
+        i = self.__event_cursor
+        if i >= len(self.__event_times) or self.__event_times[i] > t:
+            return None
+        self.__event_cursor = i + 1
+        return self.__event_masks[i], self.__event_states[i]
@@ -0,0 +1,287 @@
+import os
+import struct
+import time
+
+# One record per tick, packed as fixed-point integers (16 bytes, so a block
+# holds a whole number of records):
+#   t             uint16  seconds since the roast started
+#   temperature   int16   roast temperature, 0.1 C
+#   exhaust_temp  int16   exhaust air temperature, 0.1 C
+#   humidity      uint8   exhaust relative humidity, %
+#   flags         uint8   bit0-2: motor A/B/C on, bit3: timer running
+#   dew_point     int16   0.1 C
+#   abs_humidity  uint16  0.1 g/m3
+#   current_time  uint16  timer seconds left
+#   ror           int16   rate of rise, 0.1 C/min (0 in version 1 logs)
+RECORD_FORMAT = "<HhhBBhHHh"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+FIELDS = (
+    "t",
+    "temperature",
+    "exhaust_temp",
+    "humidity",
+    "flags",
+    "dew_point",
+    "abs_humidity",
+    "current_time",
+    "ror",
+)
+# Divisor to turn each stored integer back into its real value
+SCALES = (1, 10, 10, 1, 1, 10, 10, 1, 10)
+
+FLAG_MOTOR_A = 0x01
+FLAG_MOTOR_B = 0x02
+FLAG_MOTOR_C = 0x04
+FLAG_TIMER = 0x08
+
+# File header: magic, format version, record size, reserved (one record long)
+MAGIC = b"PYRL"
+VERSION = 2
+HEADER_FORMAT = "<4sBB10x"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+BLOCK_SIZE = 512
+RECORDS_PER_BLOCK = BLOCK_SIZE // RECORD_SIZE
+
+
+def _fixed(value, lo, hi):
+    """Round to 0.1 fixed point, clamped to the field range."""
+    v = round(value * 10)
+    return lo if v < lo else hi if v > hi else v
+
+
+class RoastRecorder:
+    def __init__(self, directory="roasts", keep=4, max_seconds=4 * 3600, ring_blocks=2):
+        """
+        Record the roast curve into a RAM ring and append it to flash block by block
+
+        :param directory: flash directory holding one log file per roast
+        :param keep: number of roast logs kept; the oldest is deleted on rotation
+        :param max_seconds: recording stops by itself after this long
+        :param ring_blocks: number of BLOCK_SIZE blocks kept in RAM
+        """
+        self.__dir = directory
+        self.__keep = keep
+        self.__max_seconds = max_seconds
+
+        # Preallocate the ring and one view per block so the hot path never
+        # allocates: sample() packs into the ring, full blocks are written as-is.
+        self.__ring = bytearray(BLOCK_SIZE * ring_blocks)
+        mv = memoryview(self.__ring)
+        self.__blocks = [mv[i * BLOCK_SIZE:(i + 1) * BLOCK_SIZE] for i in range(ring_blocks)]
+        self.__ring_records = RECORDS_PER_BLOCK * ring_blocks
+
+        self.__file = None
+        self.__path = None
+        self.__count = 0        # records in the current roast
+        self.__flushed = 0      # records already on flash
+        self.__start = 0
+        self.__last_t = -1
+
+    def is_recording(self):
+        return self.__file is not None
+
+    def get_path(self):
+        """
+        Path of the current (or last) roast log, None if nothing was recorded
+        """
+        return self.__path
+
+    def get_count(self):
+        return self.__count
+
+    def list_roasts(self):
+        """
+        Roast log numbers on flash, oldest first
+        """
+        try:
+            names = os.listdir(self.__dir)
+        except OSError:
+            return []
+        ids = []
+        for name in names:
+            if name.endswith(".bin"):
+                try:
+                    ids.append(int(name[:-4]))
+                except ValueError:
+                    pass
+        ids.sort()
+        return ids
+
+    def roast_path(self, roast_id):
+        return "{}/{}.bin".format(self.__dir, roast_id)
+
+    def latest_roast(self):
+        """
+        Number of the newest roast log, None if there is none
+        """
+        ids = self.list_roasts()
+        return ids[-1] if ids else None
+
+    def records(self, roast_id, t_from=0, t_to=None):
+        """
+        Generator over the raw records (tuples of FIELDS, still fixed point) of
+        a roast whose `t` is in [t_from, t_to]. Reads the file one block at a
+        time; for the roast being recorded it continues with the records still
+        in the RAM ring.
+
+        :raises OSError: if the roast log does not exist
+        :raises ValueError: if the file is not a roast log
+        """
+        path = self.roast_path(roast_id)
+        f = open(path, "rb")
+        try:
+            magic, version, size = struct.unpack(HEADER_FORMAT, f.read(HEADER_SIZE))
+            # Version 1 only differs by the (zeroed) reserved bytes now used by ror
+            if magic != MAGIC or version not in (1, VERSION) or size != RECORD_SIZE:
+                raise ValueError("not a roast log")
+
+            buf = bytearray(BLOCK_SIZE)
+            idx = self.__find(f, buf, t_from)
+            f.seek(HEADER_SIZE + idx * RECORD_SIZE)
+            while True:
+                got = f.readinto(buf)
+                if not got:
+                    break
+                got -= got % RECORD_SIZE
+                for off in range(0, got, RECORD_SIZE):
+                    rec = struct.unpack_from(RECORD_FORMAT, buf, off)
+                    if t_to is not None and rec[0] > t_to:
+                        return
+                    if rec[0] >= t_from:
+                        yield rec
+                idx += got // RECORD_SIZE
+
+            # Unflushed tail of the live roast. Records that already left the
+            # ring (only if the client reads slower than the ring wraps) are
+            # skipped.
+            while self.__file is not None and path == self.__path and idx < self.__count:
+                if idx >= self.__count - self.__ring_records:
+                    off = (idx % self.__ring_records) * RECORD_SIZE
+                    rec = struct.unpack_from(RECORD_FORMAT, self.__ring, off)
+                    if t_to is not None and rec[0] > t_to:
+                        return
+                    if rec[0] >= t_from:
+                        yield rec
+                idx += 1
+        finally:
+            f.close()
+
+    @staticmethod
+    def __find(f, buf, t_from):
+        """Binary search for the index of the first record with t >= t_from."""
+        lo = 0
+        hi = (f.seek(0, 2) - HEADER_SIZE) // RECORD_SIZE
+        mv = memoryview(buf)[:2]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            f.seek(HEADER_SIZE + mid * RECORD_SIZE)
+            f.readinto(mv)
+            if (buf[0] | buf[1] << 8) < t_from:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def start(self):
+        """
+        Start a new roast log, rotating out the oldest ones
+        """
+        self.stop()
+        try:
+            os.mkdir(self.__dir)
+        except OSError:
+            pass  # already exists
+
+        ids = self.list_roasts()
+        roast_id = ids[-1] + 1 if ids else 1
+        while len(ids) >= self.__keep:
+            try:
+                os.remove(self.roast_path(ids.pop(0)))
+            except OSError:
+                pass
+
+        self.__path = self.roast_path(roast_id)
+        self.__file = open(self.__path, "wb")
+        self.__file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, RECORD_SIZE))
+        self.__file.flush()
+        self.__count = 0
+        self.__flushed = 0
+        self.__start = time.ticks_ms()
+        self.__last_t = -1
+        return roast_id
+
+    def stop(self):
+        """
+        Flush the partial block and close the current roast log
+        """
+        if self.__file is None:
+            return
+        try:
+            self.__flush_partial()
+            self.__file.close()
+        except OSError as e:
+            print(f"Recorder write error: {e}")
+        finally:
+            self.__file = None
+
+    def sample(self, sensor, timer, motor):
+        """
+        Append one record for the current tick. Call once per logic_loop tick.
+        """
+        if self.__file is None:
+            return
+
+        t = time.ticks_diff(time.ticks_ms(), self.__start) // 1000
+        if t > self.__max_seconds:
+            self.stop()
+            return
+        if t == self.__last_t:
+            return  # never two records for the same second
+        self.__last_t = t
+
+        flags = motor.get_mask()
+        if timer.get_timer_status():
+            flags |= FLAG_TIMER
+        current_time = timer.get_current_time()
+
+        slot = self.__count % self.__ring_records
+        struct.pack_into(
+            RECORD_FORMAT,
+            self.__ring,
+            slot * RECORD_SIZE,
+            t,
+            _fixed(sensor.get_temperature(), -32768, 32767),
+            _fixed(sensor.get_exhaust_temp(), -32768, 32767),
+            min(max(sensor.get_humidity(), 0), 255),
+            flags,
+            _fixed(sensor.get_dew_point(), -32768, 32767),
+            _fixed(sensor.get_abs_humidity(), 0, 65535),
+            current_time if current_time < 65535 else 65535,
+            _fixed(sensor.get_ror(), -32768, 32767),
+        )
+        self.__count += 1
+
+        if self.__count % RECORDS_PER_BLOCK == 0:
+            self.__write_block((self.__count - 1) // RECORDS_PER_BLOCK)
+
+    def __write_block(self, block_no):
+        block = self.__blocks[block_no % len(self.__blocks)]
+        try:
+            self.__file.write(block)
+            self.__file.flush()  # commit each block: power loss costs at most one
+            self.__flushed = (block_no + 1) * RECORDS_PER_BLOCK
+        except OSError as e:
+            print(f"Recorder write error: {e}")
+            self.__file.close()
+            self.__file = None
+
+    def __flush_partial(self):
+        pending = self.__count - self.__flushed
+        if pending <= 0:
+            return
+        start = (self.__flushed % self.__ring_records) * RECORD_SIZE
+        self.__file.write(self.__ring[start:start + pending * RECORD_SIZE])
+        self.__file.flush()
+        self.__flushed = self.__count
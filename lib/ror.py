@@ -0,0 +1,59 @@
+from array import array
+
+
+class RateOfRise:
+    def __init__(self, window=30, period_s=1.0, resolution=0.25):
+        """
+        Rate of rise (C/min) as the least-squares slope over a sliding window
+
+        Samples are raw integer counts (MAX6675: 0.25 C per count). The window
+        keeps running sums of y and x*y, with x the sample position inside the
+        window (oldest = 0), so adding a sample is O(1) and memory is fixed.
+
+        :param window: number of samples in the window
+        :param period_s: time between samples, in seconds
+        :param resolution: degrees per raw count
+        """
+        self.__window = window
+        self.__samples = array("l", [0] * window)
+        self.__scale = resolution * 60 / period_s
+        self.reset()
+
+    def reset(self):
+        """
+        Forget all samples (e.g. after a sensor error)
+        """
+        self.__head = 0     # slot of the oldest sample
+        self.__count = 0
+        self.__sy = 0       # sum of y
+        self.__sxy = 0      # sum of x * y
+
+    def add(self, raw):
+        """
+        Add a raw sample
+        """
+        n = self.__count
+        if n < self.__window:
+            self.__samples[(self.__head + n) % self.__window] = raw
+            self.__sy += raw
+            self.__sxy += n * raw
+            self.__count = n + 1
+        else:
+            # Drop the oldest (x=0): every remaining x shifts down by one,
+            # which removes one sy from sxy; the new sample lands at x=n-1.
+            oldest = self.__samples[self.__head]
+            self.__samples[self.__head] = raw
+            self.__head = (self.__head + 1) % n
+            self.__sxy += (n - 1) * raw - (self.__sy - oldest)
+            self.__sy += raw - oldest
+
+    def get(self):
+        """
+        Current rate of rise in C/min, 0 until there are two samples
+        """
+        n = self.__count
+        if n < 2:
+            return 0
+        sx = n * (n - 1) // 2
+        sxx = (n - 1) * n * (2 * n - 1) // 6
+        return (n * self.__sxy - sx * self.__sy) / (n * sxx - sx * sx) * self.__scale
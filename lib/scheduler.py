@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+# Job fields (lists, so run() updates them in place)
+NAME = 0
+PERIOD = 1
+FUNC = 2
+DEADLINE = 3
+RUNS = 4
+LATE_TOTAL = 5
+LATE_MAX = 6
+OVERRUNS = 7
+
+
+class Scheduler:
+    def __init__(self, name="scheduler", timing=None, logger=None):
+        """
+        Periodic jobs on absolute ticks_ms deadlines
+
+        A job's next deadline is its previous deadline + its period, not the
+        time it finished + the period, so the time the jobs take and late
+        wake-ups don't add up to drift. run() sleeps only until the earliest
+        deadline and then runs every job that is due, back to back, in the
+        order they were added.
+
+        A job that falls a whole period or more behind (the loop was held, or
+        the jobs take longer than the period) skips the missed runs instead
+        of running them back to back; each skipped run counts as an overrun
+        and is logged.
+
+        :param name: task name, for TimingMonitor and log messages
+        :param timing: optional TimingMonitor: each job is timed as a section
+                       of its name, sleeps are recorded as task `name`
+        :param logger: SimpleLogger for job errors and overruns (None to disable)
+        """
+        self.__name = name
+        self.__timing = timing
+        self.__logger = logger
+        self.__jobs = []
+
+    def every(self, name, period_ms, func):
+        """
+        Run func() every `period_ms`, starting on the first run() pass
+        """
+        self.__jobs.append([name, period_ms, func, None, 0, 0, 0, 0])
+
+    def reset(self):
+        """
+        Clear the run/lateness/overrun counters
+        """
+        for job in self.__jobs:
+            job[RUNS] = job[LATE_TOTAL] = job[LATE_MAX] = job[OVERRUNS] = 0
+
+    async def run(self):
+        """
+        Scheduler task: run the jobs on their deadlines
+        """
+        timing = self.__timing
+        while True:
+            now = time.ticks_ms()
+            job = None
+            for j in self.__jobs:
+                if j[DEADLINE] is None:
+                    j[DEADLINE] = now  # new job: due right away
+                if job is None or time.ticks_diff(j[DEADLINE], job[DEADLINE]) < 0:
+                    job = j
+            if job is None:
+                await asyncio.sleep(1)  # no jobs yet
+                continue
+            wait = time.ticks_diff(job[DEADLINE], now)
+            if wait > 0:
+                if timing is not None:
+                    await timing.sleep(self.__name, wait / 1000)
+                else:
+                    await asyncio.sleep(wait / 1000)
+                continue
+            self.__run(job, -wait)
+
+    def __run(self, job, late):
+        t = self.__timing.start() if self.__timing is not None else 0
+        try:
+            job[FUNC]()
+        except Exception as e:
+            if self.__logger is not None:
+                self.__logger.error(f"{self.__name} job {job[NAME]} failed: {e}")
+        if self.__timing is not None:
+            self.__timing.stop(job[NAME], t)
+
+        job[RUNS] += 1
+        job[LATE_TOTAL] += late
+        if late > job[LATE_MAX]:
+            job[LATE_MAX] = late
+
+        period = job[PERIOD]
+        deadline = time.ticks_add(job[DEADLINE], period)
+        behind = time.ticks_diff(time.ticks_ms(), deadline)
+        if behind >= period:
+            missed = behind // period
+            deadline = time.ticks_add(deadline, missed * period)
+            job[OVERRUNS] += missed
+            if self.__logger is not None:
+                self.__logger.warning(
+                    f"{self.__name} job {job[NAME]} overran, skipped {missed} run(s)"
+                )
+        job[DEADLINE] = deadline
+
+    def get_json(self):
+        jobs = {}
+        for name, period, _, _, runs, late_total, late_max, overruns in self.__jobs:
+            jobs[name] = {
+                "period_ms": period,
+                "runs": runs,
+                "late_avg_ms": round(late_total / runs, 1) if runs else 0,
+                "late_max_ms": late_max,
+                "overruns": overruns,
+            }
+        return jobs
@@ -1,6 +1,8 @@
 from math import log, exp
 from drivers.max6675 import MAX6675
 from drivers.sht31 import SHT31
+from lib.ror import RateOfRise
+from lib.thermocouple import ThermocoupleSampler
 from machine import I2C
 
 
@@ -49,14 +51,17 @@ class SensorController:
 
         self.__max = None
         self.__max_error = None
+        self.__sampler = None
         if enable_max:
             try:
                 m = MAX6675(MAX_SCK, MAX_CS, MAX_SO)
                 m.refresh()
                 import time
                 time.sleep_ms(m.MEASUREMENT_PERIOD_MS + 50)
-                m.read()
+                sampler = ThermocoupleSampler(m)
+                sampler.add(m.read_raw())
                 self.__max = m
+                self.__sampler = sampler
             except Exception as e:
                 self.__max_error = _friendly_error(e)
 
@@ -65,14 +70,21 @@ class SensorController:
         self.__i2c = None
         self.__sht = None
         self.__sht_error = None
+        # A conversion is in flight: read_sensor_data() collects it, then
+        # triggers the next one, so the loop never waits on the sensor.
+        self.__sht_pending = False
         if enable_sht:
             try:
                 self.__i2c = I2C(0, sda=SHT_SDA, scl=SHT_SCL, freq=100000)
                 self.__sht = SHT31(self.__i2c)
+                self.__sht.trigger()
+                self.__sht_pending = True
             except Exception as e:
                 self.__sht_error = _friendly_error(e)
 
-        self.__temperature = 0    # roast temperature (MAX6675 thermocouple)
+        self.__temperature = 0    # roast temperature (MAX6675 thermocouple), 0.1 C
+        # C/min over the last 30 reads, fed in 1/16 C steps of the filtered value
+        self.__ror = RateOfRise(window=30, period_s=1, resolution=0.0625)
         self.__humidity = 0       # exhaust relative humidity % (SHT31)
         self.__exhaust_temp = 0   # exhaust air temperature C (SHT31)
         self.__dew_point = 0      # dew point C, derived from exhaust temp + RH
@@ -81,10 +93,18 @@ class SensorController:
         self.__sht_live_error = False
         self.__max_live_error = False
 
+        # What get_json() reports, updated in place by read_sensor_data():
+        # temperature, ror, humidity, exhaust_temp, dew_point, abs_humidity
+        self.__state = [0, 0.0, 0, 0, 0, 0]
+        self.__version = 0  # bumped when a value in __state changes
+        self.__json = None  # get_json() result, valid for __json_version
+        self.__json_version = -1
+
     def report(self):
         """Per-device startup labels: (sht_label, sht_detail, max_label, max_detail).
 
-        label is 'OK' | 'FAIL' | 'DISABLED'; detail carries the error string on FAIL.
+        label is 'OK' | 'FAIL' | 'DISABLED'; detail carries the error string on FAIL
+        (and the MAX6675 read backend, "spi" or "bitbang", on OK).
         """
         def lbl(enabled, obj, err):
             if not enabled:
@@ -93,6 +113,8 @@ class SensorController:
 
         s_lbl, s_det = lbl(self.__sht_enabled, self.__sht, self.__sht_error)
         m_lbl, m_det = lbl(self.__max_enabled, self.__max, self.__max_error)
+        if self.__max is not None:
+            m_det = self.__max.backend + " read"
         return (s_lbl, s_det, m_lbl, m_det)
 
     def read_sensor_data(self):
@@ -104,31 +126,69 @@ class SensorController:
 
         if self.__sht is not None:
             try:
-                t, rh = self.__sht.measure()
-                self.__exhaust_temp = round(t, 1)
-                self.__humidity = int(rh)
-                dp = _dew_point(t, rh)
-                self.__dew_point = round(dp, 1) if dp is not None else 0
-                self.__abs_humidity = round(_abs_humidity(t, rh), 1)
-                self.__sht_live_error = False
+                # Collect the conversion triggered earlier (it needs ~15ms, the
+                # loop period is 1s), then start the next one. After an error
+                # there is nothing to collect: just re-trigger.
+                if self.__sht_pending and self.__sht.ready():
+                    self.__sht_pending = False
+                    t, rh = self.__sht.fetch()
+                    self.__exhaust_temp = round(t, 1)
+                    self.__humidity = int(rh)
+                    dp = _dew_point(t, rh)
+                    self.__dew_point = round(dp, 1) if dp is not None else 0
+                    self.__abs_humidity = round(_abs_humidity(t, rh), 1)
+                    self.__sht_live_error = False
+                if not self.__sht_pending:
+                    self.__sht.trigger()
+                    self.__sht_pending = True
             except Exception:
                 self.__humidity = 0
                 self.__dew_point = 0
                 self.__abs_humidity = 0
                 self.__sht_live_error = True
+            if self.__sht_live_error:
                 error = True
 
-        if self.__max is not None:
-            try:
-                self.__temperature = int(self.__max.read())
+        if self.__sampler is not None:
+            # The thermocouple is read by run_sampler(); only pick up its
+            # filtered value here.
+            raw = self.__sampler.get_raw()
+            if self.__sampler.get_error() is None and raw is not None:
+                self.__temperature = round(raw * 0.25, 1)
+                self.__ror.add(round(raw * 4))
                 self.__max_live_error = False
-            except Exception:
+            else:
                 self.__temperature = 0
+                self.__ror.reset()
                 self.__max_live_error = True
                 error = True
 
         self.__has_error = error
 
+        changed = self.__put(0, self.__temperature)
+        changed = self.__put(1, round(self.__ror.get(), 1)) or changed
+        changed = self.__put(2, self.__humidity) or changed
+        changed = self.__put(3, self.__exhaust_temp) or changed
+        changed = self.__put(4, self.__dew_point) or changed
+        changed = self.__put(5, self.__abs_humidity) or changed
+        if changed:
+            self.__version += 1
+
+    def __put(self, i, value):
+        # Store a field of the state record; True if it changed
+        if self.__state[i] == value:
+            return False
+        self.__state[i] = value
+        return True
+
+    async def run_sampler(self):
+        """
+        Thermocouple sampler task (see ThermocoupleSampler). Returns at once
+        if the MAX6675 is disabled or failed at boot.
+        """
+        if self.__sampler is not None:
+            await self.__sampler.run()
+
     def has_error(self):
         return self.__has_error
 
@@ -146,18 +206,48 @@ class SensorController:
     def get_temperature(self):
         return self.__temperature
 
+    def get_ror(self):
+        """
+        Rate of rise of the roast temperature, in C/min
+        """
+        return self.__ror.get()
+
     def get_humidity(self):
         return self.__humidity
 
+    def get_exhaust_temp(self):
+        return self.__exhaust_temp
+
+    def get_dew_point(self):
+        return self.__dew_point
+
+    def get_abs_humidity(self):
+        return self.__abs_humidity
+
     def get_json(self):
         """
         Get sensor data in json format. `temperature` is the roast temperature
-        (thermocouple); `exhaust_temp`/`humidity`/`dew_point` come from the SHT31.
+        (filtered thermocouple, 0.1 C) and `ror` its rate of rise in C/min;
+        `exhaust_temp`/`humidity`/`dew_point` come from the SHT31.
+
+        Values are as of the last read_sensor_data(). Built once per version:
+        don't modify the returned dict.
+        """
+        if self.__json_version != self.__version:
+            state = self.__state
+            self.__json = {
+                "temperature": state[0],
+                "ror": state[1],
+                "humidity": state[2],
+                "exhaust_temp": state[3],
+                "dew_point": state[4],
+                "abs_humidity": state[5],
+            }
+            self.__json_version = self.__version
+        return self.__json
+
+    def get_version(self):
+        """
+        Counter that changes whenever get_json() changes
         """
-        return {
-            "temperature": self.__temperature,
-            "humidity": self.__humidity,
-            "exhaust_temp": self.__exhaust_temp,
-            "dew_point": self.__dew_point,
-            "abs_humidity": self.__abs_humidity,
-        }
+        return self.__version
@@ -0,0 +1,106 @@
+import asyncio
+from array import array
+
+
+class ThermocoupleSampler:
+    def __init__(self, max6675, size=5, alpha=0.4):
+        """
+        Background oversampling and filtering for the MAX6675
+
+        run() reads every conversion (one per ~220ms) instead of one per
+        logic_loop tick. The last `size` raw counts are kept in a fixed ring;
+        each new sample updates an exponential moving average of the ring's
+        median: the median rejects single-sample spikes, the EMA smooths the
+        0.25 C quantization into sub-degree resolution.
+
+        :param max6675: MAX6675 driver instance
+        :param size: number of samples in the median ring (odd)
+        :param alpha: EMA weight of each new median, 0-1 (higher = less lag)
+        """
+        self.__max = max6675
+        self.__size = size
+        self.__alpha = alpha
+        self.__ring = array("h", [0] * size)
+        self.__sorted = array("h", [0] * size)  # scratch for the median
+        self.__period_ms = max6675.MEASUREMENT_PERIOD_MS + 10
+        self.__error = None
+        self.reset()
+
+    def reset(self):
+        """
+        Forget all samples (e.g. after a read error)
+        """
+        self.__head = 0
+        self.__count = 0
+        self.__ema = None
+
+    def add(self, raw):
+        """
+        Add a raw sample (0.25 C counts) and update the filtered value
+        """
+        size = self.__size
+        self.__ring[self.__head] = raw
+        self.__head = (self.__head + 1) % size
+        if self.__count < size:
+            self.__count += 1
+
+        median = self.__median()
+        if self.__ema is None:
+            self.__ema = float(median)
+        else:
+            self.__ema += self.__alpha * (median - self.__ema)
+
+    def __median(self):
+        # Insertion sort of the filled part of the ring into the scratch array
+        n = self.__count
+        ring = self.__ring
+        s = self.__sorted
+        for i in range(n):
+            v = ring[i]
+            j = i
+            while j > 0 and s[j - 1] > v:
+                s[j] = s[j - 1]
+                j -= 1
+            s[j] = v
+        return s[n // 2]
+
+    def sample(self):
+        """
+        Read the latest conversion, if a new one is ready. A read error (e.g.
+        open thermocouple) clears the samples and is raised.
+
+        :return: True if a sample was added
+        """
+        if not self.__max.ready():
+            return False
+        try:
+            raw = self.__max.read_raw()
+        except Exception:
+            self.reset()
+            raise
+        self.add(raw)
+        return True
+
+    async def run(self):
+        """
+        Sampler task: read every conversion, record the last error
+        """
+        while True:
+            try:
+                self.sample()
+                self.__error = None
+            except Exception as e:
+                self.__error = e
+            await asyncio.sleep(self.__period_ms / 1000)
+
+    def get_raw(self):
+        """
+        Filtered value in 0.25 C counts (float), or None before the first sample
+        """
+        return self.__ema
+
+    def get_error(self):
+        """
+        Exception of the last failed read, or None if the last read worked
+        """
+        return self.__error
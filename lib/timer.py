@@ -1,4 +1,4 @@
-from machine import Timer
+import time
 
 
 class TimerController:
@@ -11,8 +11,12 @@ class TimerController:
 
         self.__timer_counter = 0
         self.__timer_is_active = False
+        self.__next_tick = 0  # ticks_ms of the next 1s step
 
-        self.__htimer = Timer(0)  # Hardware timer
+        # Bumped whenever get_json() would return something different
+        self.__version = 0
+        self.__json = None  # get_json() result, valid for __json_version
+        self.__json_version = -1
 
     def get_current_time(self):
         return self.__current_time
@@ -24,39 +28,47 @@ class TimerController:
         """
         Increase the current time and total time by 1m to maintain percentage consistency
         """
-        self.__current_time += 60
-        self.__total_time += 60
+        self.__set_times(self.__total_time + 60, self.__current_time + 60)
 
-    def _tick(self, t):
-        """
-        Hardware timer callback — decreases current time by 1s
-        """
-        self.__current_time -= 1
-        if self.__current_time <= 0:
-            self.__current_time = 0
+    def __set_times(self, total_time, current_time):
+        # Bump the version only if get_json() changes
+        if total_time != self.__total_time or current_time != self.__current_time:
+            self.__total_time = total_time
+            self.__current_time = current_time
+            self.__version += 1
+
+    def update(self):
+        """
+        Count down the seconds elapsed since start_timer(). Called by the
+        logic_loop scheduler; steps are on absolute 1s deadlines, so a late
+        call catches up instead of losing time.
+        """
+        if not self.__timer_is_active:
+            return
+        now = time.ticks_ms()
+        while time.ticks_diff(now, self.__next_tick) >= 0:
+            self.__next_tick = time.ticks_add(self.__next_tick, 1000)
+            if self.__current_time > 0:
+                self.__current_time -= 1
+                self.__version += 1
 
     def decrease_current_time(self):
         """
         Manual decrease — reduces current time by 60s
         """
-        self.__current_time -= 60
-        if self.__current_time <= 0:
-            self.__current_time = 0
+        self.__set_times(self.__total_time, max(self.__current_time - 60, 0))
 
     def set_timer_values(self, time: int):
         """
         Set the timer values
         """
-        self.__total_time = time
-        self.__current_time = time
+        self.__set_times(time, time)
 
     def start_timer(self):
         """
         Start the timer
         """
-        self.__htimer.init(
-            period=1000, mode=Timer.PERIODIC, callback=self._tick
-        )
+        self.__next_tick = time.ticks_add(time.ticks_ms(), 1000)
         self.__timer_is_active = True
         self.__timer_counter += 1
 
@@ -64,18 +76,27 @@ class TimerController:
         """
         Stop the timer
         """
-        self.__htimer.deinit()
         self.__timer_is_active = False
         self.reset_timer()
 
     def get_json(self):
         """
-        Get time values in json format
+        Get time values in json format. Built once per version: don't modify
+        the returned dict.
+        """
+        if self.__json_version != self.__version:
+            self.__json = {
+                "total_time": self.__total_time,
+                "current_time": self.__current_time,
+            }
+            self.__json_version = self.__version
+        return self.__json
+
+    def get_version(self):
+        """
+        Counter that changes whenever get_json() changes
         """
-        return {
-            "total_time": self.__total_time,
-            "current_time": self.__current_time,
-        }
+        return self.__version
 
     def get_timer_status(self):
         """
@@ -87,5 +108,4 @@ class TimerController:
         """
         Reset time values
         """
-        self.__total_time = 0
-        self.__current_time = 0
+        self.__set_times(0, 0)
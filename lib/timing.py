@@ -0,0 +1,149 @@
+import asyncio
+import time
+
+# Lower edges (ms) of the stall histogram buckets; the last one is open-ended
+STALL_BUCKETS_MS = (10, 20, 50, 100, 200, 500, 1000)
+
+
+class TimingMonitor:
+    def __init__(self, period_ms=50, stall_ms=10, log_ms=100, logger=None):
+        """
+        Event-loop stall detector and per-task/section timing
+
+        watch() is a task that sleeps `period_ms` over and over; waking up late
+        means something held the (cooperative) event loop. Every stall of
+        `stall_ms` or more is counted in a histogram and attributed to the
+        longest section timed since the previous wake-up ("other" if none
+        was timed, e.g. a driver called outside a section). Stalls of `log_ms`
+        or more are also logged as warnings.
+
+        Sections are timed with start()/stop(); tasks that sleep through
+        sleep() get their wake-up lateness recorded.
+
+        :param period_ms: watchdog sleep period
+        :param stall_ms: smallest lateness counted as a stall
+        :param log_ms: smallest stall that is logged
+        :param logger: SimpleLogger for stall warnings (None to disable)
+        """
+        self.__period_ms = period_ms
+        self.__stall_ms = stall_ms
+        self.__log_ms = log_ms
+        self.__logger = logger
+        self.reset()
+
+    def reset(self):
+        """
+        Clear all counters
+        """
+        self.__sections = {}  # name -> [count, total_us, max_us, stalls]
+        self.__tasks = {}  # name -> [count, total_late_ms, max_late_ms]
+        self.__histogram = [0] * len(STALL_BUCKETS_MS)
+        self.__stalls = 0
+        self.__stall_max_ms = 0
+        self.__stall_max_section = None
+        # Longest section since the last watchdog wake-up
+        self.__window_name = None
+        self.__window_us = 0
+
+    def start(self):
+        """
+        Start timing a section; pass the result to stop()
+        """
+        return time.ticks_us()
+
+    def stop(self, name, started):
+        """
+        Record a section that began at `started` (from start())
+        """
+        us = time.ticks_diff(time.ticks_us(), started)
+        s = self.__sections.get(name)
+        if s is None:
+            s = self.__sections[name] = [0, 0, 0, 0]
+        s[0] += 1
+        s[1] += us
+        if us > s[2]:
+            s[2] = us
+        if us > self.__window_us:
+            self.__window_name = name
+            self.__window_us = us
+
+    async def sleep(self, name, seconds):
+        """
+        asyncio.sleep(), recording how late task `name` wakes up
+        """
+        t = time.ticks_ms()
+        await asyncio.sleep(seconds)
+        late = time.ticks_diff(time.ticks_ms(), t) - int(seconds * 1000)
+        if late < 0:
+            late = 0
+        task = self.__tasks.get(name)
+        if task is None:
+            task = self.__tasks[name] = [0, 0, 0]
+        task[0] += 1
+        task[1] += late
+        if late > task[2]:
+            task[2] = late
+
+    async def watch(self):
+        """
+        Watchdog task: detect, count and attribute event-loop stalls
+        """
+        period_ms = self.__period_ms
+        while True:
+            self.__window_name = None
+            self.__window_us = 0
+            t = time.ticks_ms()
+            await asyncio.sleep(period_ms / 1000)
+            late = time.ticks_diff(time.ticks_ms(), t) - period_ms
+            if late >= self.__stall_ms:
+                self.__stall(late)
+
+    def __stall(self, late_ms):
+        # Attribute to the longest section if it explains at least half the stall
+        name = self.__window_name
+        if name is None or self.__window_us < late_ms * 500:
+            name = "other"
+        else:
+            self.__sections[name][3] += 1
+
+        self.__stalls += 1
+        i = len(STALL_BUCKETS_MS) - 1
+        while i > 0 and late_ms < STALL_BUCKETS_MS[i]:
+            i -= 1
+        self.__histogram[i] += 1
+        if late_ms > self.__stall_max_ms:
+            self.__stall_max_ms = late_ms
+            self.__stall_max_section = name
+
+        if self.__logger is not None and late_ms >= self.__log_ms:
+            self.__logger.warning(f"Event loop stalled {late_ms}ms ({name})")
+
+    def get_json(self):
+        sections = {}
+        for name, (count, total_us, max_us, stalls) in self.__sections.items():
+            sections[name] = {
+                "count": count,
+                "avg_us": total_us // count,
+                "max_us": max_us,
+                "stalls": stalls,
+            }
+        tasks = {}
+        for name, (count, total_ms, max_ms) in self.__tasks.items():
+            tasks[name] = {
+                "count": count,
+                "late_avg_ms": round(total_ms / count, 1),
+                "late_max_ms": max_ms,
+            }
+        histogram = {}
+        for edge, count in zip(STALL_BUCKETS_MS, self.__histogram):
+            histogram[str(edge)] = count
+        return {
+            "stalls": {
+                "count": self.__stalls,
+                "max_ms": self.__stall_max_ms,
+                "max_section": self.__stall_max_section,
+                "histogram_ms": histogram,
+            },
+            "tasks": tasks,
+            "sections": sections,
+        }
@@ -1,16 +1,26 @@
-import gc
-import json
+import random
+import time
 import machine
 
 from microdot import Microdot
+from microdot.microdot import MultiDict
 from microdot.cors import CORS
-from microdot.sse import with_sse
+from microdot.etag import ETag
+from microdot.sse import with_sse, SSEBroadcaster
 import asyncio
 
 from lib.lcd import LcdController
 from lib.timer import TimerController
 from lib.motors import MotorController
 from lib.sensors import SensorController
+from lib.heater import HeaterController
+from lib.profile import RoastProfile
+from lib.recorder import RoastRecorder
+from lib.history import FORMATS, CONTENT_TYPES, parse_fields, history_body
+from lib.timing import TimingMonitor
+from lib.scheduler import Scheduler
+from lib.gc_policy import GcPolicy
+from lib.config_store import ConfigStore
 from controller import Controller
 
 from logger import SimpleLogger
@@ -32,6 +42,12 @@ MOTOR1_PIN = machine.Pin(25, machine.Pin.OUT, value=0)
 MOTOR2_PIN = machine.Pin(26, machine.Pin.OUT, value=0)
 MOTOR3_PIN = machine.Pin(27, machine.Pin.OUT, value=0)
 
+# Heater / burner relay, driven with time-proportioned PWM in "pid" mode
+HEATER_PIN = machine.Pin(32, machine.Pin.OUT, value=0)
+HEATER_PERIOD_MS = 100
+
+HTTP_PORT = 80
+
 # --- Hardware enable flags (set False to disable a device for testing) ---
 # A disabled device is never initialized (its I2C bus / pins are left untouched)
 # and never triggers a fault LED -- useful to bring up one bus at a time.
@@ -56,22 +72,36 @@ def _make_dummy_lcd():
         {
             "show_data": lambda self, temperature, humidity, time_in_seconds: None,
             "show_ip": lambda self, ip_str: None,
+            "connected": lambda self: False,
+            "run": lambda self, timing=None: _no_lcd(),
         },
     )()
 
 
+async def _no_lcd():
+    pass
+
+
+def _lcd_error(e):
+    return "not connected (no device found on I2C bus)" if "ENODEV" in str(e) else str(e)
+
+
 lcd_ok = False
 lcd_err = None
 if ENABLE_LCD:
     try:
+        # Keeps re-probing in its task if the display isn't there yet
         lcd = LcdController(LCD_SDA, LCD_SCL)
-        lcd_ok = True
+        lcd_ok = lcd.connected()
+        if not lcd_ok:
+            lcd_err = _lcd_error(lcd.get_error())
+            logger.error(f"Failed to initialize LCD: {lcd_err}")
         import network
         ap = network.WLAN(network.AP_IF)
         if ap.active():
             lcd.show_ip(ap.ifconfig()[0])
     except Exception as e:
-        lcd_err = "not connected (no device found on I2C bus)" if "ENODEV" in str(e) else str(e)
+        lcd_err = _lcd_error(e)
         logger.error(f"Failed to initialize LCD: {lcd_err}")
         lcd = _make_dummy_lcd()
 else:
@@ -81,7 +111,12 @@ sensorc = SensorController(SHT_SDA, SHT_SCL, MAX_SCK, MAX_CS, MAX_SO,
                            enable_sht=ENABLE_SHT, enable_max=ENABLE_MAX)
 timerc = TimerController()
 motorc = MotorController(MOTOR1_PIN, MOTOR2_PIN, MOTOR3_PIN)
-controller = Controller(sensorc, timerc, motorc)
+heater = HeaterController(HEATER_PIN)
+controller = Controller(sensorc, timerc, motorc, heater)
+recorder = RoastRecorder()
+timing = TimingMonitor(logger=logger)
+gc_policy = GcPolicy()
+config_store = ConfigStore(logger=logger)
 
 # --- Startup status report ---
 def _fmt(label, detail):
@@ -98,6 +133,7 @@ print("  LCD      : {}".format(lcd_lbl))
 print("  SHT31    : {}".format(_fmt(sht_lbl, sht_det)))
 print("  MAX6675  : {}".format(_fmt(max_lbl, max_det)))
 print("  Motors   : configured (pins 25,26,27)")
+print("  Heater   : configured (pin 32)")
 import network
 _ap = network.WLAN(network.AP_IF)
 print("  AP       : {}".format(_ap.ifconfig()[0] if _ap.active() else "inactive"))
@@ -122,16 +158,34 @@ if _RESET_CAUSES.get(_reset_cause) in ("BROWNOUT_RESET", "WDT_RESET"):
 def current_error_blinks():
     """Live LED blink code, re-evaluated each cycle by led_status_task.
 
-    Highest-priority error wins (3=MAX, 2=SHT, 1=LCD, 0=all OK). Sensor health is
-    read live (disabled devices count as OK); lcd_ok stays the boot-time value
-    (no live LCD health probe exists).
+    Highest-priority error wins (3=MAX, 2=SHT, 1=LCD, 0=all OK). Sensor and LCD
+    health are read live (disabled devices count as OK); the LCD task re-probes
+    a missing display, so its blink code clears when one is plugged in.
     """
     sht_ok, max_ok = sensorc.health()
-    return 3 if not max_ok else 2 if not sht_ok else 1 if (ENABLE_LCD and not lcd_ok) else 0
+    return 3 if not max_ok else 2 if not sht_ok else 1 if (ENABLE_LCD and not lcd.connected()) else 0
 
 
 app = Microdot()
-cors = CORS(app, allowed_origins="*", allow_credentials=True)
+# Reuse connections for the dashboard's clicks instead of a TCP handshake each
+# time; cap the open sockets well below the lwIP pool. /events streams have
+# their own cap, so dashboards can't starve the control endpoints, and a
+# socket that never sends a request is closed instead of holding a slot
+app.keep_alive_timeout = 5
+app.request_timeout = 5
+app.max_connections = 8
+app.max_streams = 4
+cors = CORS(app, allowed_origins="*", allow_credentials=True, expose_headers=["ETag"])
+etag = ETag(app)
+events = SSEBroadcaster()
+
+# The controller's version counter restarts at 0 on every boot: tag it with a
+# per-boot id so a tag cached before a reset can't match
+_boot_id = "{:08x}".format(random.getrandbits(32))
+
+
+def controller_etag():
+    return '"{}-{}"'.format(_boot_id, controller.get_version())
 
 
 # Add routes to the server
@@ -159,11 +213,13 @@ async def change_time(request):
 
 
 @app.get("/controller_config")
+@etag.versioned(controller_etag)
 async def get_controller_config(request):
     return controller.get_config()
 
 
 @app.patch("/controller_config")
+@etag.versioned(controller_etag)
 async def change_controller_config(request):
     data = request.json
     if data is None:
@@ -172,11 +228,37 @@ async def change_controller_config(request):
     err = validate_body(data, {
         "starting_temperature": (int, False, {"min": 0}),
         "time": (int, False, {"min": 0}),
+        "mode": (str, False, {"enum": ["threshold", "pid"]}),
+        "setpoint": (int, False, {"min": 0, "max": 400}),
+        "kp": ((int, float), False, {"min": 0}),
+        "ki": ((int, float), False, {"min": 0}),
+        "kd": ((int, float), False, {"min": 0}),
+        "profile": (list, False, None),
     })
     if err:
         return {"error": err}, 400
 
-    return controller.set_config(data.get("starting_temperature"), data.get("time"))
+    if "profile" in data:
+        try:
+            controller.set_profile(data["profile"])
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+    return controller.set_config(
+        data.get("starting_temperature"),
+        data.get("time"),
+        mode=data.get("mode"),
+        setpoint=data.get("setpoint"),
+        kp=data.get("kp"),
+        ki=data.get("ki"),
+        kd=data.get("kd"),
+    )
+
+
+@app.get("/controller_profile")
+@etag.versioned(controller_etag)
+async def get_controller_profile(request):
+    return {"profile": controller.get_profile()}
 
 
 @app.post("/controller")
@@ -194,10 +276,18 @@ async def handle_controller(request):
     action = data["action"]
     if action == "activate":
         controller.activate()
+        # A repeated activate keeps the current log (start() would rotate it)
+        if not recorder.is_recording():
+            try:
+                logger.info("Recording roast #{}".format(recorder.start()))
+            except OSError as e:
+                logger.error(f"Failed to start roast log: {e}")
     elif action == "deactivate":
         controller.deactivate()
+        recorder.stop()
     elif action == "stop":
         controller.stop()
+        recorder.stop()
 
     return controller.get_config()
 
@@ -231,13 +321,18 @@ async def handle_motors(request):
     return motorc.get_json()
 
 
+def saved_configs_response():
+    """Saved presets as served by the /config routes: the cached JSON + ETag."""
+    return config_store.dumps(), {
+        "Content-Type": "application/json; charset=UTF-8",
+        "ETag": config_store.etag(),
+    }
+
+
 @app.get("/config")
+@etag.versioned(config_store.etag)
 async def get_saved_configs(request):
-    try:
-        with open("config.json", "r") as config_file:
-            return json.load(config_file)
-    except (OSError, ValueError):
-        return {"error": "Failed to read config file"}, 500
+    return saved_configs_response()
 
 
 @app.post("/config")
@@ -250,55 +345,70 @@ async def save_new_config(request):
         "name": (str, True, None),
         "starting_temperature": (int, True, {"min": 0}),
         "time": (int, True, {"min": 0}),
+        "profile": (list, False, None),
     })
     if err:
         return {"error": err}, 400
-
-    try:
-        with open("config.json", "r") as config_file:
-            config = json.load(config_file)
-    except (OSError, ValueError):
-        return {"error": "Failed to read config file"}, 500
+    if data.get("profile"):
+        try:
+            RoastProfile(data["profile"])
+        except ValueError as e:
+            return {"error": str(e)}, 400
 
     name = decode(data["name"])
-    if name in config:
+    if name in config_store:
         return {"error": "Name already exists"}, 400
-    config[name] = {
+    config = {
         "starting_temperature": data["starting_temperature"],
         "time": data["time"],
     }
+    if data.get("profile"):
+        config["profile"] = data["profile"]
+    config_store.put(name, config)
 
-    try:
-        with open("config.json", "w") as config_file:
-            json.dump(config, config_file)
-    except OSError:
-        return {"error": "Failed to write config file"}, 500
-
-    return config
+    return saved_configs_response()
 
 
 @app.delete("/config/<name>")
 async def delete_saved_config(request, name):
     name = decode(name)
-
-    try:
-        with open("config.json", "r") as config_file:
-            config = json.load(config_file)
-    except (OSError, ValueError):
-        return {"error": "Failed to read config file"}, 500
-
-    if name not in config:
+    if name not in config_store:
         return {"error": "Config not found"}, 404
+    config_store.remove(name)
 
-    del config[name]
+    return saved_configs_response()
 
-    try:
-        with open("config.json", "w") as config_file:
-            json.dump(config, config_file)
-    except OSError:
-        return {"error": "Failed to write config file"}, 500
 
-    return config
+@app.get("/history")
+async def get_history(request):
+    args = request.args or MultiDict()  # a plain dict without a query string
+    try:
+        roast = args.get("roast", type=int)
+        t_from = args.get("from", 0, type=int)
+        t_to = args.get("to", type=int)
+        every = args.get("every", 1, type=int)
+        bucket = args.get("bucket", 0, type=int)
+    except ValueError:
+        return {"error": "'roast', 'from', 'to', 'every' and 'bucket' must be integers"}, 400
+    fmt = args.get("format", "csv")
+    if fmt not in FORMATS:
+        return {"error": f"'format' must be one of {list(FORMATS)}"}, 400
+    if every < 1 or bucket < 0 or t_from < 0:
+        return {"error": "'every' must be >= 1, 'from' and 'bucket' must be >= 0"}, 400
+    try:
+        fields = parse_fields(args.get("fields"))
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    if roast is None:
+        roast = recorder.latest_roast()
+    if roast is None or roast not in recorder.list_roasts():
+        return {"error": "Roast not found"}, 404
+
+    records = recorder.records(roast, t_from, t_to)
+    return history_body(records, fields, fmt, every, bucket), 200, {
+        "Content-Type": CONTENT_TYPES[fmt],
+    }
 
 
 @app.post("/reset")
@@ -315,95 +425,204 @@ async def handle_reset(request):
 @with_sse
 async def handle_events(request, sse):
     logger.info("Client connected")
-    last_sensor = None
-    last_timer = None
-    last_motor = None
-    last_controller = None
+    events.subscribe(sse)
     try:
-        while True:
-            sensor_data = sensorc.get_json()
-            timer_data = timerc.get_json()
-            motor_data = motorc.get_json()
-            controller_data = controller.get_config()
+        # Frames are queued by publish_events(); just stay subscribed until
+        # the client goes away and the response cancels this task.
+        await asyncio.Event().wait()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        events.unsubscribe(sse)
+    logger.info("Client disconnected")
 
-            if sensor_data != last_sensor:
-                await sse.send(sensor_data, event="sensors")
-                last_sensor = sensor_data
 
-            if timer_data != last_timer:
-                await sse.send(timer_data, event="time")
-                last_timer = timer_data
+@app.get("/debug/sse")
+async def get_sse_stats(request):
+    return events.stats()
 
-            if motor_data != last_motor:
-                await sse.send(motor_data, event="states")
-                last_motor = motor_data
 
-            if controller_data != last_controller:
-                await sse.send(controller_data, event="controller")
-                last_controller = controller_data
+def timing_json():
+    data = timing.get_json()
+    data["jobs"] = logic.get_json()
+    return data
+
+
+@app.get("/debug/timing")
+async def get_timing(request):
+    return timing_json()
+
+
+@app.delete("/debug/timing")
+async def reset_timing(request):
+    timing.reset()
+    logic.reset()
+    return timing_json()
 
-            await asyncio.sleep(1)
-    except asyncio.CancelledError:
-        pass
-    logger.info("Client disconnected")
 
+@app.get("/debug/gc")
+async def get_gc(request):
+    return gc_policy.get_json()
 
-async def logic_loop():
-    """Core logic: sensor reads, motor control, LCD - runs always."""
+
+@app.delete("/debug/gc")
+async def reset_gc(request):
+    gc_policy.reset()
+    return gc_policy.get_json()
+
+
+@app.before_request
+async def start_request_timing(request):
+    request.g.timing_start = timing.start()
+
+
+@app.after_request
+async def stop_request_timing(request, response):
+    timing.stop("http", request.g.timing_start)
+
+
+# SSE event name, version counter and snapshot of each published state
+_EVENT_SOURCES = (
+    ("sensors", sensorc.get_version, sensorc.get_json),
+    ("time", timerc.get_version, timerc.get_json),
+    ("states", motorc.get_version, motorc.get_json),
+    ("controller", controller.get_version, controller.get_config),
+)
+_published = [-1] * len(_EVENT_SOURCES)  # version last published, per source
+
+
+def publish_events():
+    """Push changed snapshots to every /events client.
+
+    Called once per logic_loop tick. A source is only looked at if its
+    version moved since the last publish: the snapshot dict is then built
+    once by its owner and serialized once, no matter how many clients are
+    connected.
+    """
+    for i in range(len(_EVENT_SOURCES)):
+        name, get_version, get_json = _EVENT_SOURCES[i]
+        version = get_version()
+        if version != _published[i]:
+            events.publish(get_json(), event=name)
+            _published[i] = version
+
+
+def read_sensors():
+    sensorc.read_sensor_data()
+    motorc.read_motor_states()
+
+
+def record_roast():
+    recorder.sample(sensorc, timerc, motorc)
+    # run() ends the roast by itself when the timer runs out: close the log
+    # with that last tick instead of recording an idle roaster for hours
+    if recorder.is_recording() and not controller.is_active():
+        recorder.stop()
+
+
+_shown = [-1, -1]  # sensor and timer versions last posted to the LCD
+
+
+def show_data():
+    sensor_version = sensorc.get_version()
+    timer_version = timerc.get_version()
+    if sensor_version == _shown[0] and timer_version == _shown[1]:
+        return
+    _shown[0] = sensor_version
+    _shown[1] = timer_version
+
+    sensor_data = sensorc.get_json()
+    timer_data = timerc.get_json()
+
+    # Drawn by lcd.run(), never blocks on the I2C bus
+    lcd.show_data(
+        round(sensor_data["temperature"]),
+        sensor_data["humidity"],
+        timer_data["current_time"],
+    )
+
+    logger.debug(
+        "T: {}C H: {}%".format(
+            sensor_data["temperature"],
+            sensor_data["humidity"],
+        )
+    )
+    logger.debug(format_time(timer_data["current_time"]))
+
+
+# Core logic: sensor reads, motor control, LCD - runs always. Each job is on
+# absolute deadlines, so the period doesn't stretch by the time the jobs take
+# or by HTTP load; jobs due together run in this order.
+logic = Scheduler("logic_loop", timing=timing, logger=logger)
+logic.every("timer", 1000, timerc.update)
+logic.every("sensors", 1000, read_sensors)
+logic.every("display", 1000, show_data)
+logic.every("controller", 1000, controller.run)
+logic.every("recorder", 1000, record_roast)
+logic.every("publish", 1000, publish_events)
+logic.every("gc", 1000, gc_policy.tick)  # last: the idle gap after the tick
+
+
+async def heater_loop():
+    """Heater PID + relay PWM on its own fixed period, independent of logic_loop."""
+    last = time.ticks_ms()
     while True:
+        await timing.sleep("heater_loop", HEATER_PERIOD_MS / 1000)
+        now = time.ticks_ms()
         try:
-            sensorc.read_sensor_data()
-            motorc.read_motor_states()
-
-            sensor_data = sensorc.get_json()
-            timer_data = timerc.get_json()
-
-            lcd.show_data(
-                sensor_data["temperature"],
-                sensor_data["humidity"],
-                timer_data["current_time"],
-            )
-
-            logger.debug(
-                "T: {}C H: {}%".format(
-                    sensor_data["temperature"],
-                    sensor_data["humidity"],
-                )
-            )
-            logger.debug(format_time(timer_data["current_time"]))
-
-            controller.run()
+            t = timing.start()
+            controller.run_heater(time.ticks_diff(now, last))
+            timing.stop("heater", t)
         except Exception as e:
-            logger.error(f"Logic loop error: {e}")
-
-        gc.collect()
-        await asyncio.sleep(1)
+            heater.off()
+            logger.error(f"Heater loop error: {e}")
+        last = now
 
 
 async def server_task():
     """Web server task - doesn't block if it fails."""
     try:
-        await app.run(port=80, debug=True)
+        await app.start_server(port=HTTP_PORT, debug=True)
     except Exception as e:
         logger.error(f"Web server error: {e}")
         logger.info("Web server stopped, continuing without it...")
 
 
 async def main():
-    task_logic = asyncio.create_task(logic_loop())
+    task_logic = asyncio.create_task(logic.run())
     task_server = asyncio.create_task(server_task())
-    task_led = asyncio.create_task(led_status_task(current_error_blinks))
+    task_led = asyncio.create_task(led_status_task(current_error_blinks, timing))
+    task_heater = asyncio.create_task(heater_loop())
+    task_timing = asyncio.create_task(timing.watch())
+    task_sampler = asyncio.create_task(sensorc.run_sampler())
+    task_config = asyncio.create_task(config_store.run())
+    task_lcd = asyncio.create_task(lcd.run(timing))
 
     try:
-        await asyncio.gather(task_logic, task_server, task_led)
+        await asyncio.gather(
+            task_logic, task_server, task_led, task_heater, task_timing, task_sampler, task_config,
+            task_lcd,
+        )
     except (KeyboardInterrupt, asyncio.CancelledError):
         logger.info("Shutting down...")
         task_logic.cancel()
         task_server.cancel()
         task_led.cancel()
+        task_heater.cancel()
+        task_timing.cancel()
+        task_sampler.cancel()
+        task_config.cancel()
+        task_lcd.cancel()
+        heater.off()
+        config_store.flush()
         await task_logic
         await task_server
         await task_led
+        await task_heater
+        await task_timing
+        await task_sampler
+        await task_config
+        await task_lcd
         logger.info("Shutdown complete.")
 
 
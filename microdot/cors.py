@@ -110,6 +110,9 @@ class CORS:
         return cors_headers
 
     def after_request(self, request, response):
+        if request is None:
+            # the request could not be parsed (e.g. the client hung up)
+            return
         saved_vary = response.headers.get("Vary")
         response.headers.update(self.get_cors_headers(request))
         if saved_vary and saved_vary != response.headers.get("Vary"):
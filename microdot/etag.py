@@ -0,0 +1,82 @@
+from microdot.helpers import wraps
+from microdot.microdot import Response, invoke_handler
+
+
+class ETag:
+    """Conditional GET support with ``ETag`` and ``If-None-Match``.
+
+    :param app: The application to add ``ETag`` headers to.
+
+    Routes decorated with :meth:`versioned` return ``304 Not Modified``
+    with no body, without running the handler, when the client already has
+    the current version, and their ``200`` responses carry an ``ETag``
+    header::
+
+        etag = ETag(app)
+
+        @app.get('/settings')
+        @etag.versioned(lambda: '"{}"'.format(settings.version))
+        async def get_settings(request):
+            return settings.to_dict()
+
+    The ``ETag`` header is computed after the handler runs, so a route that
+    changes the data returns the new version.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.initialize(app)
+
+    def initialize(self, app):
+        """Initialize the ETag object for the given application.
+
+        :param app: The application to add ``ETag`` headers to.
+        """
+        app.after_request(self.after_request)
+
+    def versioned(self, get_etag):
+        """Decorator that adds conditional GET support to a route.
+
+        :param get_etag: A function that returns the current entity tag of
+                         the route's data, including the double quotes. It
+                         is called on every request, so it should be cheap
+                         (e.g. format a version counter).
+        """
+
+        def decorated(f):
+            @wraps(f)
+            async def etag_handler(request, *args, **kwargs):
+                request.g.etag = get_etag
+                if request.method in ("GET", "HEAD") and self.matches(
+                    request.headers.get("If-None-Match"), get_etag()
+                ):
+                    return Response(status_code=304, reason="Not Modified")
+                return await invoke_handler(f, request, *args, **kwargs)
+
+            return etag_handler
+
+        return decorated
+
+    @staticmethod
+    def matches(if_none_match, etag):
+        """Check an ``If-None-Match`` header against an entity tag.
+
+        :param if_none_match: The header value, or ``None``.
+        :param etag: The current entity tag.
+        """
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                tag = tag[2:]  # If-None-Match uses the weak comparison
+            if tag == etag:
+                return True
+        return False
+
+    def after_request(self, request, response):
+        get_etag = getattr(request.g, "etag", None)
+        if get_etag is not None and response.status_code in (200, 304):
+            response.headers["ETag"] = get_etag()
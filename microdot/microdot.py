@@ -55,6 +55,7 @@ except ImportError:  # pragma: no cover
 
 
 MUTED_SOCKET_ERRORS = [
+    9,  # Bad file descriptor (closed on eviction)
     32,  # Broken pipe
     54,  # Connection reset by peer
     104,  # Connection reset by peer
@@ -159,6 +160,120 @@ class NoCaseDict(dict):
             self[key] = value
 
 
+class RequestHeaders(NoCaseDict):
+    """The headers of a request, parsed on demand.
+
+    :param raw: the header lines as received, preceded by a ``\\n``.
+
+    Looking up a header with ``[]``, ``get()`` or ``in`` searches the raw
+    bytes and only decodes the value of that header. Any other use of the
+    dictionary (iteration, ``items()``, changes...) parses all the headers
+    first.
+    """
+
+    #: Search strings of the header names looked up so far, shared by all
+    #: requests (applications look up a handful of names).
+    needles = {}
+
+    def __init__(self, raw=b"\n"):
+        self._raw = self._lower = None
+        super().__init__()
+        self._raw = raw
+        self._found = {}
+
+    def _find(self, key):
+        if key in self._found:
+            return self._found[key]
+        needle = RequestHeaders.needles.get(key)
+        if needle is None:
+            needle = RequestHeaders.needles[key] = b"\n" + key.lower().encode()
+        if self._lower is None:
+            self._lower = self._raw.lower()
+        lower = self._lower
+        # the last occurrence wins, as when the headers are stored in a dict
+        i = lower.rfind(needle)
+        value = None
+        n = len(lower)
+        while i >= 0:
+            # the name may be followed by whitespace before the colon, and
+            # must not be the start of a longer name
+            start = i + len(needle)
+            while start < n and lower[start] in (32, 9):  # " ", "\t"
+                start += 1
+            if start < n and lower[start] == 58:  # ":"
+                end = self._raw.find(b"\n", start)
+                value = self._raw[start + 1 : end if end >= 0 else len(self._raw)]
+                value = value.strip().decode()
+                break
+            i = lower.rfind(needle, 0, i)
+        self._found[key] = value
+        return value
+
+    def _parse(self):
+        raw = self._raw
+        self._raw = self._lower = self._found = None
+        for line in raw.split(b"\n"):
+            if line.strip():
+                header, value = line.decode().split(":", 1)
+                super().__setitem__(header.strip(), value.strip())
+
+    def __getitem__(self, key):
+        if self._raw is None:
+            return super().__getitem__(key)
+        value = self._find(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        if self._raw is None:
+            return super().__contains__(key)
+        return self._find(key) is not None
+
+    def get(self, key, default=None):
+        if self._raw is None:
+            return super().get(key, default)
+        value = self._find(key)
+        return default if value is None else value
+
+    def __setitem__(self, key, value):
+        if self._raw is not None:
+            self._parse()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        if self._raw is not None:
+            self._parse()
+        super().__delitem__(key)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def keys(self):
+        if self._raw is not None:
+            self._parse()
+        return super().keys()
+
+    def values(self):
+        if self._raw is not None:
+            self._parse()
+        return super().values()
+
+    def items(self):
+        if self._raw is not None:
+            self._parse()
+        return super().items()
+
+    def copy(self):
+        return NoCaseDict(dict(self.items()))
+
+
 def mro(cls):  # pragma: no cover
     """Return the method resolution order of a class.
 
@@ -341,6 +456,16 @@ class Request:
     #:    Request.max_readline = 16 * 1024  # 16KB lines allowed
     max_readline = 2 * 1024
 
+    #: Specify the maximum size of all the header lines of a request
+    #: together. Requests with more headers are rejected with a 400 status
+    #: code.
+    max_header_size = 8 * 1024
+
+    #: Initial size of the buffer the header lines are read into. The buffer
+    #: grows as needed, up to ``max_header_size``, and is reused for all the
+    #: requests of a connection.
+    header_buffer_size = 512
+
     class G:
         pass
 
@@ -396,12 +521,13 @@ class Request:
             self.path, self.query_string = self.path.split("?", 1)
             self.args = self._parse_urlencoded(self.query_string)
 
-        if "Content-Length" in self.headers:
-            self.content_length = int(self.headers["Content-Length"])
-        if "Content-Type" in self.headers:
-            self.content_type = self.headers["Content-Type"]
-        if "Cookie" in self.headers:
-            for cookie in self.headers["Cookie"].split(";"):
+        content_length = self.headers.get("Content-Length")
+        if content_length is not None:
+            self.content_length = int(content_length)
+        self.content_type = self.headers.get("Content-Type")
+        cookies = self.headers.get("Cookie")
+        if cookies is not None:
+            for cookie in cookies.split(";"):
                 name, value = cookie.strip().split("=", 1)
                 self.cookies[name] = value
 
@@ -414,7 +540,7 @@ class Request:
         self.after_request_handlers = []
 
     @staticmethod
-    async def create(app, client_reader, client_writer, client_addr):
+    async def create(app, client_reader, client_writer, client_addr, buffer=None):
         """Create a request object.
 
         :param app: The Microdot application instance.
@@ -423,6 +549,8 @@ class Request:
         :param client_writer: An output stream where the response data can be
                               written.
         :param client_addr: The address of the client, as a tuple.
+        :param buffer: A ``bytearray`` to read the header lines into, or
+                       ``None`` to allocate one. It is enlarged if needed.
 
         This method is a coroutine. It returns a newly created ``Request``
         object.
@@ -434,18 +562,25 @@ class Request:
         method, url, http_version = line.split()
         http_version = http_version.split("/", 1)[1]
 
-        # headers
-        headers = NoCaseDict()
-        content_length = 0
+        # headers: the lines are copied into the buffer as they are and only
+        # decoded when looked up
+        if buffer is None:
+            buffer = bytearray(Request.header_buffer_size)
+        buffer[0] = 10  # b"\n" before the first header name
+        size = 1
         while True:
-            line = (await Request._safe_readline(client_reader)).strip().decode()
-            if line == "":
+            line = await Request._safe_readline(client_reader)
+            if len(line) <= 2:  # b"\r\n", b"\n" or the end of the stream
                 break
-            header, value = line.split(":", 1)
-            value = value.strip()
-            headers[header] = value
-            if header.lower() == "content-length":
-                content_length = int(value)
+            if line.find(b":") < 1:
+                raise ValueError("invalid header")
+            end = size + len(line)
+            if end > Request.max_header_size:
+                raise ValueError("headers too long")
+            buffer[size:end] = line  # grows the buffer when it's too small
+            size = end
+        headers = RequestHeaders(bytes(memoryview(buffer)[:size]))
+        content_length = int(headers.get("Content-Length", 0))
 
         # body
         body = b""
@@ -588,6 +723,11 @@ class Response:
 
     send_file_buffer_size = 1024
 
+    #: Largest body, in bytes, that is written together with the status line
+    #: and the headers in a single write. Larger and streamed bodies are
+    #: written after the headers.
+    max_coalesced_body = 1024
+
     #: The content type to use for responses that do not explicitly define a
     #: ``Content-Type`` header.
     default_content_type = "text/plain"
@@ -616,6 +756,8 @@ class Response:
             # this applies to bytes, file-like objects or generators
             self.body = body
         self.is_head = False
+        #: The HTTP version in the status line.
+        self.http_version = "1.0"
 
     def set_cookie(
         self,
@@ -679,6 +821,9 @@ class Response:
         )
 
     def complete(self):
+        if self.status_code == 304:
+            # no body; any Content-* headers would describe the cached one
+            return
         if isinstance(self.body, bytes) and "Content-Length" not in self.headers:
             self.headers["Content-Length"] = str(len(self.body))
         if "Content-Type" not in self.headers:
@@ -686,35 +831,42 @@ class Response:
             if "charset=" not in self.headers["Content-Type"]:
                 self.headers["Content-Type"] += "; charset=UTF-8"
 
+    def header_bytes(self):
+        """Return the status line and the headers, up to and including the
+        blank line that ends them, encoded."""
+        reason = (
+            self.reason
+            if self.reason is not None
+            else ("OK" if self.status_code == 200 else "N/A")
+        )
+        head = ["HTTP/", self.http_version, " ", str(self.status_code), " ", reason]
+        for header, value in self.headers.items():
+            values = value if isinstance(value, list) else [value]
+            for value in values:
+                head.append("\r\n")
+                head.append(header)
+                head.append(": ")
+                head.append(value if isinstance(value, str) else str(value))
+        head.append("\r\n\r\n")
+        return "".join(head).encode()
+
     async def write(self, stream):
         self.complete()
 
         try:
-            # status code
-            reason = (
-                self.reason
-                if self.reason is not None
-                else ("OK" if self.status_code == 200 else "N/A")
-            )
-            await stream.awrite(
-                "HTTP/1.0 {status_code} {reason}\r\n".format(
-                    status_code=self.status_code, reason=reason
-                ).encode()
-            )
-
-            # headers
-            for header, value in self.headers.items():
-                values = value if isinstance(value, list) else [value]
-                for value in values:
-                    await stream.awrite(
-                        "{header}: {value}\r\n".format(
-                            header=header, value=value
-                        ).encode()
-                    )
-            await stream.awrite(b"\r\n")
-
-            # body
-            if not self.is_head:
+            head = self.header_bytes()
+            body = self.body
+            if self.is_head or body == b"":
+                await stream.awrite(head)
+            elif isinstance(body, bytes):
+                # one write (one TCP segment) for most responses
+                if len(body) <= self.max_coalesced_body:
+                    await stream.awrite(head + body)
+                else:
+                    await stream.awrite(head)
+                    await stream.awrite(body)
+            else:
+                await stream.awrite(head)
                 iter = self.body_iter()
                 async for body in iter:
                     if isinstance(body, str):  # pragma: no cover
@@ -970,6 +1122,93 @@ class URLPattern:
         return "URLPattern: {}".format(self.url_pattern)
 
 
+class RouteIndex:
+    """Dispatch index over an application's URL map.
+
+    Built once from ``url_map`` and used by :meth:`Microdot.find_route` to
+    narrow each lookup down to the routes that can match the path, in URL map
+    order, so the first-match semantics of a linear scan are kept:
+
+    - static routes (no arguments) are found with a single dict lookup; the
+      entry also lists any parameterized route matching that same path
+    - routes with ``string`` and ``int`` arguments are stored in a prefix
+      tree with one level per path segment
+    - ``path`` and ``re:`` routes can't be indexed by segment and are always
+      candidates
+
+    The ``Allow`` header of OPTIONS responses is cached per path.
+    """
+
+    #: Maximum number of paths with a cached ``Allow`` header.
+    max_allow_cache = 32
+
+    def __init__(self, url_map):
+        self.size = len(url_map)
+        self.static = {}
+        self.tree = {}  # {"s": {segment: node}, "p": node, "r": [indexes]}
+        self.regex = []
+        self.allow_cache = {}
+        for i, (_, pattern, _, _, _) in enumerate(url_map):
+            names = [seg.get("name") for seg in pattern.segments]
+            if pattern.regex:
+                self.regex.append(i)
+            elif any(names):
+                node = self.tree
+                for seg, name in zip(pattern.url_pattern.lstrip("/").split("/"), names):
+                    if name:
+                        node = node.setdefault("p", {})
+                    else:
+                        node = node.setdefault("s", {}).setdefault(seg, {})
+                node.setdefault("r", []).append(i)
+            else:
+                self.static.setdefault(
+                    "/" + pattern.url_pattern.lstrip("/"), []
+                ).append(i)
+        # a static path can also be matched by parameterized routes
+        for path, routes in self.static.items():
+            self.static[path] = self._merge(routes, self._dynamic(path))
+
+    @staticmethod
+    def _merge(a, b):
+        if not b:
+            return tuple(a)
+        if not a:
+            return tuple(b)
+        return tuple(sorted(a + b))
+
+    def _dynamic(self, path):
+        found = []
+        if self.tree and path[:1] == "/":
+            segments = path[1:].split("/")
+            nodes = [self.tree]
+            for seg in segments:
+                following = []
+                for node in nodes:
+                    child = node.get("s", {}).get(seg)
+                    if child is not None:
+                        following.append(child)
+                    if seg and "p" in node:
+                        following.append(node["p"])
+                nodes = following
+                if not nodes:
+                    break
+            for node in nodes:
+                found.extend(node.get("r", ()))
+        if self.regex:
+            found.extend(self.regex)
+            found.sort()
+        elif len(found) > 1:
+            found.sort()
+        return found
+
+    def candidates(self, path):
+        """Indexes in the URL map of the routes that may match ``path``."""
+        routes = self.static.get(path)
+        if routes is None:
+            routes = self._dynamic(path)
+        return routes
+
+
 class HTTPException(Exception):
     def __init__(self, status_code, reason=None):
         self.status_code = status_code
@@ -993,8 +1232,43 @@ class Microdot:
         app = Microdot()
     """
 
+    #: Seconds an idle connection is kept open waiting for another request.
+    #: Set to 0 (the default) to close the connection after every response.
+    #: A connection is only kept alive if the client asks for it (HTTP/1.1,
+    #: or HTTP/1.0 with ``Connection: keep-alive``) and the length of the
+    #: response is known in advance.
+    #:
+    #: Example::
+    #:
+    #:    Microdot.keep_alive_timeout = 5
+    keep_alive_timeout = 0
+
+    #: Maximum number of requests served on a kept-alive connection.
+    max_keep_alive_requests = 100
+
+    #: Maximum number of connections open at the same time, or 0 for no
+    #: limit. Connections beyond the limit receive a 503 response and are
+    #: closed, and the last free connection is not kept alive, so idle
+    #: connections can't take every slot. Open streams are not counted, see
+    #: ``max_streams``.
+    max_connections = 0
+
+    #: Seconds a new connection may take to send its first request, or 0 to
+    #: wait forever. A client that connects and never sends anything (a
+    #: browser preconnect, a phone that left the network without closing)
+    #: would otherwise hold a connection slot until the socket dies.
+    request_timeout = 0
+
+    #: Maximum number of long-lived streams (responses whose body has a
+    #: true ``long_lived`` attribute, such as SSE) open at the same time, or
+    #: 0 for no limit. A stream releases its connection slot once it starts,
+    #: so a few event clients can't starve ordinary requests. Streams beyond
+    #: the limit receive a 503 response.
+    max_streams = 0
+
     def __init__(self):
         self.url_map = []
+        self.route_index = None
         self.before_request_handlers = []
         self.after_request_handlers = []
         self.after_error_request_handlers = []
@@ -1003,6 +1277,8 @@ class Microdot:
         self.options_handler = self.default_options_handler
         self.debug = False
         self.server = None
+        self.connections = 0
+        self.streams = 0
 
     def route(self, url_pattern, methods=None):
         """Decorator that is used to register a function as a request handler
@@ -1036,6 +1312,7 @@ class Microdot:
         """
 
         def decorated(f):
+            self.route_index = None
             self.url_map.append(
                 (
                     [m.upper() for m in (methods or ["GET"])],
@@ -1225,6 +1502,7 @@ class Microdot:
                       sub-application. When ``False``, they apply to the entire
                       application. The default is ``False``.
         """
+        self.route_index = None
         for methods, pattern, handler, _prefix, _subapp in subapp.url_map:
             self.url_map.append(
                 (
@@ -1322,10 +1600,17 @@ class Microdot:
                     self.close()
                     await self.wait_closed()
 
+                def abort(self):
+                    # close() keeps the socket open until the unsent data
+                    # is flushed, which never happens if the client
+                    # stopped reading
+                    self.transport.abort()
+
                 from types import MethodType
 
                 writer.awrite = MethodType(awrite, writer)
                 writer.aclose = MethodType(aclose, writer)
+                writer.abort = MethodType(abort, writer)
 
             await self.handle_request(reader, writer)
 
@@ -1403,6 +1688,14 @@ class Microdot:
         """
         self.server.close()
 
+    def get_route_index(self):
+        """Return the :class:`RouteIndex` of the URL map, (re)building it
+        if routes were added since it was built."""
+        index = self.route_index
+        if index is None or index.size != len(self.url_map):
+            index = self.route_index = RouteIndex(self.url_map)
+        return index
+
     def find_route(self, req):
         method = req.method.upper()
         if method == "OPTIONS" and self.options_handler:
@@ -1412,13 +1705,16 @@ class Microdot:
         f = 404
         p = ""
         s = None
-        for (
-            route_methods,
-            route_pattern,
-            route_handler,
-            url_prefix,
-            subapp,
-        ) in self.url_map:
+        req.url_args = None
+        url_map = self.url_map
+        for i in self.get_route_index().candidates(req.path):
+            (
+                route_methods,
+                route_pattern,
+                route_handler,
+                url_prefix,
+                subapp,
+            ) = url_map[i]
             req.url_args = route_pattern.match(req.path)
             if req.url_args is not None:
                 p = url_prefix
@@ -1431,27 +1727,101 @@ class Microdot:
         return f, p, s
 
     def default_options_handler(self, req):
-        allow = []
-        for route_methods, route_pattern, _, _, _ in self.url_map:
-            if route_pattern.match(req.path) is not None:
-                allow.extend(route_methods)
-        if "GET" in allow:
-            allow.append("HEAD")
-        allow.append("OPTIONS")
-        return {"Allow": ", ".join(allow)}
+        index = self.get_route_index()
+        allow = index.allow_cache.get(req.path)
+        if allow is None:
+            methods = []
+            for i in index.candidates(req.path):
+                route_methods, route_pattern, _, _, _ = self.url_map[i]
+                if route_pattern.match(req.path) is not None:
+                    methods.extend(route_methods)
+            if "GET" in methods:
+                methods.append("HEAD")
+            methods.append("OPTIONS")
+            allow = ", ".join(methods)
+            if len(index.allow_cache) >= index.max_allow_cache:
+                index.allow_cache.clear()
+            index.allow_cache[req.path] = allow
+        return {"Allow": allow}
 
     async def handle_request(self, reader, writer):
-        req = None
+        self.connections += 1
+        rejected = self.max_connections and self.connections > self.max_connections
+        buffer = bytearray(Request.header_buffer_size)
+        stream = False
         try:
-            req = await Request.create(
-                self, reader, writer, writer.get_extra_info("peername")
-            )
-        except Exception as exc:  # pragma: no cover
-            print_exception(exc)
+            served = 0
+            while True:
+                req = None
+                try:
+                    create = Request.create(
+                        self,
+                        reader,
+                        writer,
+                        writer.get_extra_info("peername"),
+                        buffer=buffer,
+                    )
+                    if served:
+                        # kept-alive connection: wait for the next request
+                        create = asyncio.wait_for(create, self.keep_alive_timeout)
+                    elif self.request_timeout:
+                        create = asyncio.wait_for(create, self.request_timeout)
+                    req = await create
+                except asyncio.TimeoutError:
+                    break
+                except Exception as exc:  # pragma: no cover
+                    print_exception(exc)
+                if req is None and served:
+                    break  # the client closed a kept-alive connection
+                served += 1
 
-        res = await self.dispatch_request(req)
-        if res != Response.already_handled:  # pragma: no branch
-            await res.write(writer)
+                if rejected:
+                    res = Response("Too many connections", 503)
+                else:
+                    res = await self.dispatch_request(req)
+                    if res != Response.already_handled and getattr(
+                        res.body, "long_lived", False
+                    ):
+                        if self.max_streams and self.streams >= self.max_streams:
+                            await res.body.aclose()
+                            res = Response("Too many streams", 503)
+                        else:
+                            # a stream doesn't hold a connection slot
+                            stream = True
+                            self.streams += 1
+                            self.connections -= 1
+                keep_alive = False
+                if res != Response.already_handled:  # pragma: no branch
+                    if self.keep_alive_timeout:
+                        keep_alive = not rejected and self.keep_alive(
+                            req, res, served
+                        )
+                        if req and req.http_version == "1.1":
+                            res.http_version = "1.1"
+                        if keep_alive:
+                            res.headers["Connection"] = "keep-alive"
+                            res.headers["Keep-Alive"] = "timeout={}, max={}".format(
+                                self.keep_alive_timeout,
+                                self.max_keep_alive_requests - served,
+                            )
+                        else:
+                            res.headers["Connection"] = "close"
+                    await res.write(writer)
+                if self.debug and req:  # pragma: no cover
+                    print(
+                        "{method} {path} {status_code}".format(
+                            method=req.method,
+                            path=req.path,
+                            status_code=res.status_code,
+                        )
+                    )
+                if not keep_alive:
+                    break
+        finally:
+            if stream:
+                self.streams -= 1
+            else:
+                self.connections -= 1
         try:
             await writer.aclose()
         except OSError as exc:  # pragma: no cover
@@ -1459,12 +1829,30 @@ class Microdot:
                 pass
             else:
                 raise
-        if self.debug and req:  # pragma: no cover
-            print(
-                "{method} {path} {status_code}".format(
-                    method=req.method, path=req.path, status_code=res.status_code
-                )
-            )
+
+    def keep_alive(self, req, res, served):
+        """Decide if the connection can be reused after this response.
+
+        :param req: The request, or ``None`` if it could not be parsed.
+        :param res: The response about to be written.
+        :param served: The number of requests served on the connection,
+                       including this one.
+        """
+        if req is None or served >= self.max_keep_alive_requests:
+            return False
+        if self.max_connections and self.connections >= self.max_connections:
+            return False
+        if req.content_length and req._stream is not None:
+            # the body was not read, the next request can't be found
+            return False
+        connection = req.headers.get("Connection", "").lower()
+        if req.http_version == "1.1":
+            if connection == "close":
+                return False
+        elif connection != "keep-alive":
+            return False
+        res.complete()
+        return res.status_code == 304 or "Content-Length" in res.headers
 
     def get_request_handlers(self, req, attr, local_first=True):
         handlers = getattr(self, attr + "_handlers")
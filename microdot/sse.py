@@ -2,17 +2,54 @@ import asyncio
 import json
 from microdot.helpers import wraps
 
+try:
+    from time import ticks_ms, ticks_diff
+except ImportError:  # CPython
+    from time import monotonic
+
+    def ticks_ms():
+        return int(monotonic() * 1000)
+
+    def ticks_diff(a, b):
+        return a - b
+
 
 class SSE:
     """Server-Sent Events object.
 
     An object of this class is sent to handler functions to manage the SSE
     connection.
+
+    Events wait to be written in a fixed-capacity ring, so a client that
+    stops reading cannot exhaust the heap. A named event replaces a queued
+    event with the same name instead of taking a new slot, and when the ring
+    is full the oldest event is dropped. A client with events that have
+    been waiting for ``max_stall`` seconds without any being written is
+    disconnected: its socket is closed, which also ends a write blocked on
+    it.
     """
 
+    #: Maximum number of events queued per connection.
+    max_queue = 8
+
+    #: Seconds queued events may wait without a single one being written
+    #: before the client is disconnected. Set to 0 to never disconnect.
+    max_stall = 15
+
     def __init__(self):
         self.event = asyncio.Event()
-        self.queue = []
+        self._frames = [None] * self.max_queue
+        self._names = [None] * self.max_queue
+        self._head = 0
+        self._count = 0
+        self._waiting = 0  # ticks_ms() since the oldest queued event waits
+        self._abort = None  # closes the connection, set by sse_response()
+        #: ``True`` once the connection was evicted for falling behind.
+        self.closed = False
+        #: Events discarded because the ring was full.
+        self.dropped = 0
+        #: Events replaced by a newer event with the same name.
+        self.coalesced = 0
 
     async def send(self, data, event=None, event_id=None):
         """Send an event to the client.
@@ -25,20 +62,155 @@ class SSE:
         :param event_id: an optional event id, to send along with the data. If
                       given, it must be a string.
         """
-        if isinstance(data, (dict, list)):
-            data = json.dumps(data).encode()
-        elif isinstance(data, str):
-            data = data.encode()
-        elif not isinstance(data, bytes):
-            data = str(data).encode()
-        data = b"data: " + data + b"\n\n"
-        if event_id:
-            data = b"id: " + event_id.encode() + b"\n" + data
-        if event:
-            data = b"event: " + event.encode() + b"\n" + data
-        self.queue.append(data)
+        self.push(format_event(data, event=event, event_id=event_id), event)
+
+    def push(self, frame, event=None):
+        """Queue an already formatted event for the client.
+
+        :param frame: the event in SSE wire format, as returned by
+                      :func:`format_event`.
+        :param event: the event name, used to coalesce queued events.
+
+        Unlike :meth:`send`, this method is not a coroutine, so it can be
+        called from synchronous code such as :class:`SSEBroadcaster`.
+        """
+        if self.closed:
+            return
+        size = len(self._frames)
+        if event is not None:
+            for i in range(self._count):
+                j = (self._head + i) % size
+                if self._names[j] == event:
+                    self._frames[j] = frame
+                    self.coalesced += 1
+                    self._check_stall()
+                    return
+        if self._count == size:
+            self._head = (self._head + 1) % size
+            self._count -= 1
+            self.dropped += 1
+        if self._count:
+            self._check_stall()
+        else:
+            self._waiting = ticks_ms()
+        j = (self._head + self._count) % size
+        self._frames[j] = frame
+        self._names[j] = event
+        self._count += 1
         self.event.set()
 
+    def _check_stall(self):
+        # Events are waiting: evict the client if none was written for
+        # max_stall seconds. A client that stalls briefly loses nothing that
+        # matters, newer events replace the queued ones
+        if not self.max_stall:
+            return
+        if ticks_diff(ticks_ms(), self._waiting) >= self.max_stall * 1000:
+            self.closed = True
+            self.event.set()
+            if self._abort is not None:
+                self._abort()
+
+    def _pop(self):
+        if self._count == 0:
+            return None
+        frame = self._frames[self._head]
+        self._frames[self._head] = None
+        self._names[self._head] = None
+        self._head = (self._head + 1) % len(self._frames)
+        self._count -= 1
+        self._waiting = ticks_ms()  # the next event starts waiting now
+        return frame
+
+
+def format_event(data, event=None, event_id=None):
+    """Serialize an event into the SSE wire format.
+
+    The arguments are the same as for :meth:`SSE.send`. The returned bytes can
+    be queued on any number of connections with :meth:`SSE.push`.
+    """
+    if isinstance(data, (dict, list)):
+        data = json.dumps(data).encode()
+    elif isinstance(data, str):
+        data = data.encode()
+    elif not isinstance(data, bytes):
+        data = str(data).encode()
+    data = b"data: " + data + b"\n\n"
+    if event_id:
+        data = b"id: " + event_id.encode() + b"\n" + data
+    if event:
+        data = b"event: " + event.encode() + b"\n" + data
+    return data
+
+
+class SSEBroadcaster:
+    """Fan out events to all the subscribed SSE connections.
+
+    Each event is serialized once by :meth:`publish` and the same bytes are
+    queued on every subscriber, so the per-client cost is a socket write. The
+    last frame of each named event is kept, and replayed to new subscribers so
+    that they start with the current state.
+
+    Example::
+
+        events = SSEBroadcaster()
+
+        @app.route('/events')
+        @with_sse
+        async def handle_events(request, sse):
+            events.subscribe(sse)
+            try:
+                await asyncio.Event().wait()
+            finally:
+                events.unsubscribe(sse)
+
+        # elsewhere, e.g. in a periodic task
+        events.publish({'temperature': 120}, event='sensors')
+    """
+
+    def __init__(self):
+        self.clients = []
+        self.last = {}
+        #: Connections disconnected for falling behind.
+        self.evicted = 0
+        self._dropped = 0
+        self._coalesced = 0
+
+    def subscribe(self, sse):
+        """Register a connection and replay the last frame of each event."""
+        self.clients.append(sse)
+        for event, frame in self.last.items():
+            sse.push(frame, event)
+
+    def unsubscribe(self, sse):
+        """Remove a connection. Unknown connections are ignored."""
+        if sse in self.clients:
+            self.clients.remove(sse)
+            self._dropped += sse.dropped
+            self._coalesced += sse.coalesced
+            if sse.closed:
+                self.evicted += 1
+
+    def stats(self):
+        """Return the frame counters, including those of past connections."""
+        return {
+            "clients": len(self.clients),
+            "dropped": self._dropped + sum(c.dropped for c in self.clients),
+            "coalesced": self._coalesced + sum(c.coalesced for c in self.clients),
+            "evicted": self.evicted,
+        }
+
+    def publish(self, data, event=None, event_id=None):
+        """Serialize an event once and queue it on every subscriber.
+
+        The arguments are the same as for :meth:`SSE.send`.
+        """
+        frame = format_event(data, event=event, event_id=event_id)
+        if event:
+            self.last[event] = frame
+        for sse in self.clients:
+            sse.push(frame, event)
+
 
 def sse_response(request, event_function, *args, **kwargs):
     """Return a response object that initiates an event stream.
@@ -56,6 +228,19 @@ def sse_response(request, event_function, *args, **kwargs):
     used instead.
     """
     sse = SSE()
+    writer = request.sock[1] if request.sock else None
+
+    def abort():
+        # An evicted client has stopped reading, so the response is most
+        # likely blocked writing to it: close the socket to make that write
+        # fail and end the response, the handler and the subscription
+        if hasattr(writer, "abort"):
+            writer.abort()
+        else:
+            asyncio.create_task(writer.aclose())
+
+    if writer is not None:
+        sse._abort = abort
 
     async def sse_task_wrapper():
         await event_function(request, sse, *args, **kwargs)
@@ -64,18 +249,19 @@ def sse_response(request, event_function, *args, **kwargs):
     task = asyncio.create_task(sse_task_wrapper())
 
     class sse_loop:
+        long_lived = True  # see Microdot.max_streams
+
         def __aiter__(self):
             return self
 
         async def __anext__(self):
             event = None
-            while sse.queue or not task.done():
-                try:
-                    event = sse.queue.pop(0)
+            while not sse.closed and (sse._count or not task.done()):
+                event = sse._pop()
+                if event is not None:
                     break
-                except IndexError:
-                    await sse.event.wait()
-                    sse.event.clear()
+                await sse.event.wait()
+                sse.event.clear()
             if event is None:
                 raise StopAsyncIteration
             return event
@@ -0,0 +1,127 @@
+"""Host-side (CPython) simulation of the roaster hardware.
+
+:func:`install` makes the MicroPython-only modules importable on CPython
+(``machine``, ``network``, ``webrepl``, ``micropython``, ``utime`` and the
+``time.ticks_*``/``sleep_ms``/``sleep_us`` functions) and wires simulated
+devices to the pins used by ``main.py``. After that, the firmware modules
+import and run unmodified::
+
+    import sim
+    board = sim.install()
+    import main
+
+Run the whole firmware, web server included, with ``python -m sim.run``.
+"""
+
+import sys
+import time
+
+_TICKS_PERIOD = 1 << 30
+_TICKS_MAX = _TICKS_PERIOD - 1
+_TICKS_HALF = _TICKS_PERIOD // 2
+_T0 = time.monotonic()
+
+
+def ticks_ms():
+    return int((time.monotonic() - _T0) * 1000) & _TICKS_MAX
+
+
+def ticks_us():
+    return int((time.monotonic() - _T0) * 1000000) & _TICKS_MAX
+
+
+def ticks_cpu():
+    return ticks_us()
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & _TICKS_MAX
+
+
+def ticks_diff(ticks1, ticks2):
+    return ((ticks1 - ticks2 + _TICKS_HALF) & _TICKS_MAX) - _TICKS_HALF
+
+
+def sleep_ms(ms):
+    time.sleep(ms / 1000)
+
+
+def sleep_us(us):
+    time.sleep(us / 1000000)
+
+
+def _patch_time():
+    for f in (ticks_ms, ticks_us, ticks_cpu, ticks_add, ticks_diff, sleep_ms, sleep_us):
+        if not hasattr(time, f.__name__):
+            setattr(time, f.__name__, f)
+
+
+class Board:
+    """The simulated devices, wired like the real roaster (see main.py).
+
+    :param sht: attach the SHT31 humidity sensor to I2C(0)
+    :param max6675: attach the thermocouple converter to GPIO 5/23/19
+    :param lcd: attach the PCF8574 LCD backpack to I2C(1)
+    :param aht: attach an AHT20 to I2C(0) as well
+    :param model: the thermal model (a default RoasterModel if omitted)
+    """
+
+    MAX_SCK = 5
+    MAX_CS = 23
+    MAX_SO = 19
+    HEATER = 32
+    MOTORS = (25, 26, 27)
+
+    def __init__(self, sht=True, max6675=True, lcd=True, aht=False, model=None):
+        from sim import devices
+        from sim.machine import Pin, attach_i2c
+
+        self.model = model or devices.RoasterModel(heater_pin=Pin(self.HEATER))
+        if self.model.heater_pin is None:
+            self.model.heater_pin = Pin(self.HEATER)
+
+        self.max6675 = None
+        if max6675:
+            self.max6675 = devices.MAX6675(
+                self.model, Pin(self.MAX_SCK), Pin(self.MAX_CS), Pin(self.MAX_SO)
+            )
+        self.sht = None
+        if sht:
+            self.sht = devices.SHT31(self.model)
+            attach_i2c(0, 0x44, self.sht)
+        self.aht = None
+        if aht:
+            self.aht = devices.AHT20(self.model)
+            attach_i2c(0, 0x38, self.aht)
+        self.lcd = None
+        if lcd:
+            self.lcd = devices.LCD()
+            attach_i2c(1, 0x27, self.lcd)
+
+    def motors(self):
+        """Relay states of motors A, B and C."""
+        from sim.machine import Pin
+
+        return tuple(bool(Pin(p).value()) for p in self.MOTORS)
+
+    def heater(self):
+        from sim.machine import Pin
+
+        return bool(Pin(self.HEATER).value())
+
+
+def install(**board_options):
+    """Register the stand-in modules and build the simulated :class:`Board`.
+
+    Must run before any firmware module is imported. Keyword arguments are
+    passed to :class:`Board`.
+    """
+    _patch_time()
+    from sim import machine, micropython, network, webrepl
+
+    sys.modules.setdefault("machine", machine)
+    sys.modules.setdefault("network", network)
+    sys.modules.setdefault("webrepl", webrepl)
+    sys.modules.setdefault("micropython", micropython)
+    sys.modules.setdefault("utime", time)
+    return Board(**board_options)
@@ -0,0 +1,282 @@
+"""Simulated roaster hardware: thermal model, sensors and the LCD backpack.
+
+The devices talk to the firmware through :mod:`sim.machine` the same way the
+real chips do (bit-banged SPI on pins, I2C transactions), so the unmodified
+drivers in ``drivers/`` run against them.
+"""
+
+import math
+import random
+import time
+
+from sim.plant import ThermalPlant
+
+# Commands written as 2-byte words
+SHT31_MEASURE_HIGHREP = 0x2400
+SHT31_HEATER_ON = 0x306D
+SHT31_HEATER_OFF = 0x3066
+SHT31_SOFT_RESET = 0x30A2
+SHT31_MEASURE_MS = 15
+
+
+def crc8(data):
+    """Sensirion CRC-8 (polynomial 0x31, init 0xFF)."""
+    crc = 0xFF
+    for b in data:
+        crc ^= b
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x31) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+def _nack():
+    import errno
+
+    return OSError(errno.ENODEV, "ENODEV")
+
+
+class RoasterModel:
+    """Real-time roaster: a :class:`ThermalPlant` advanced from the wall clock.
+
+    The plant is stepped lazily whenever a sensor samples it. The heater input
+    follows the heater relay pin, if given.
+
+    :param plant: the thermal model (a default ThermalPlant if omitted)
+    :param heater_pin: relay pin that switches the plant's heater
+    :param speed: plant time per wall-clock second (e.g. 10 to heat up fast)
+    :param noise: standard deviation of the thermocouple noise, in C
+    :param exhaust_ratio: fraction of the drum temperature rise seen by the
+                          exhaust air sensor
+    :param moisture: absolute humidity of the exhaust air, in g/m3
+    """
+
+    STEP_S = 0.1
+
+    def __init__(
+        self,
+        plant=None,
+        heater_pin=None,
+        speed=1.0,
+        noise=0.3,
+        exhaust_ratio=0.3,
+        moisture=12.0,
+    ):
+        self.plant = plant or ThermalPlant()
+        self.heater_pin = heater_pin
+        self.speed = speed
+        self.noise = noise
+        self.exhaust_ratio = exhaust_ratio
+        self.moisture = moisture
+        self._last = time.monotonic()
+
+    def _advance(self):
+        now = time.monotonic()
+        dt = (now - self._last) * self.speed
+        self._last = now
+        if self.heater_pin is not None:
+            self.plant.heater = bool(self.heater_pin.value())
+        while dt > 0:
+            step = self.STEP_S if dt > self.STEP_S else dt
+            self.plant.step(step)
+            dt -= step
+
+    def temperature(self):
+        """Drum/bean temperature as the thermocouple sees it."""
+        self._advance()
+        return self.plant.temperature + random.gauss(0.0, self.noise)
+
+    def exhaust_temp(self):
+        self._advance()
+        ambient = self.plant.ambient
+        return ambient + (self.plant.temperature - ambient) * self.exhaust_ratio
+
+    def humidity(self):
+        """Exhaust relative humidity for a fixed absolute humidity."""
+        t = self.exhaust_temp()
+        es = 6.112 * math.exp(17.67 * t / (t + 243.5))
+        rh = self.moisture * (t + 273.15) / (2.167 * es)
+        return min(max(rh, 0.0), 100.0)
+
+
+class MAX6675:
+    """Thermocouple converter on bit-banged pins (SCK, CS, SO).
+
+    Pulling CS low latches the conversion and presents bit 15 on SO; every
+    falling SCK edge shifts out the next bit. Works with both the bit-banged
+    and the SPI read (sim.machine.SPI clocks the same pins).
+
+    :param open_circuit: report an unplugged thermocouple (bit 2 set)
+    """
+
+    def __init__(self, model, sck, cs, so, open_circuit=False):
+        self.model = model
+        self.open_circuit = open_circuit
+        self._frame = 0
+        self._bit = -1
+        self._sck = sck
+        cs._listeners.append(self._on_cs)
+        sck._listeners.append(self._on_sck)
+        so._source = self._so
+
+    def _on_cs(self, pin, value):
+        if value == 0:
+            count = int(self.model.temperature() * 4)
+            count = min(max(count, 0), 0xFFF)
+            self._frame = (count << 3) | (0x4 if self.open_circuit else 0)
+            self._bit = 15
+        else:
+            self._bit = -1
+
+    def _on_sck(self, pin, value):
+        if value == 0 and self._bit >= 0:
+            self._bit -= 1
+
+    def _so(self):
+        if self._bit < 0:
+            return 0
+        return (self._frame >> self._bit) & 1
+
+
+class SHT31:
+    """Humidity/temperature sensor (single-shot mode, no clock stretching).
+
+    Reading before the conversion finished is NACKed, like the real chip.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.heater = False
+        self._ready_at = None
+        self._frame = None
+
+    def _word(self, value):
+        raw = bytes([(value >> 8) & 0xFF, value & 0xFF])
+        return raw + bytes([crc8(raw)])
+
+    def _measure(self):
+        t = self.model.exhaust_temp()
+        rh = self.model.humidity()
+        t_raw = int(min(max((t + 45) * 65535 / 175, 0), 65535))
+        h_raw = int(min(max(rh * 65535 / 100, 0), 65535))
+        self._frame = self._word(t_raw) + self._word(h_raw)
+        self._ready_at = time.monotonic() + SHT31_MEASURE_MS / 1000
+
+    def i2c_write(self, data):
+        if len(data) < 2:
+            return
+        cmd = (data[0] << 8) | data[1]
+        if cmd == SHT31_MEASURE_HIGHREP:
+            self._measure()
+        elif cmd == SHT31_HEATER_ON:
+            self.heater = True
+        elif cmd == SHT31_HEATER_OFF:
+            self.heater = False
+        elif cmd == SHT31_SOFT_RESET:
+            self.heater = False
+            self._frame = None
+
+    def i2c_read(self, nbytes):
+        if self._frame is None or time.monotonic() < self._ready_at:
+            raise _nack()
+        frame = self._frame
+        self._frame = None  # single shot: one read per measurement
+        return frame[:nbytes]
+
+
+class AHT20:
+    """Humidity/temperature sensor: status byte + 5 data bytes + CRC."""
+
+    MEASURE_MS = 80
+
+    def __init__(self, model):
+        self.model = model
+        self.calibrated = False
+        self._busy_until = 0.0
+        self._data = bytes(5)
+
+    def i2c_write(self, data):
+        if not data:
+            return
+        cmd = data[0]
+        if cmd == 0xBA:  # soft reset
+            self.calibrated = False
+        elif cmd in (0xBE, 0xE1):  # initialize / calibrate
+            self.calibrated = True
+        elif cmd == 0xAC:  # trigger
+            t = self.model.exhaust_temp()
+            rh = self.model.humidity()
+            h = int(rh * 0x100000 / 100) & 0xFFFFF
+            tr = int((t + 50) * 0x100000 / 200) & 0xFFFFF
+            self._data = bytes(
+                [h >> 12, (h >> 4) & 0xFF, ((h & 0xF) << 4) | (tr >> 16), (tr >> 8) & 0xFF, tr & 0xFF]
+            )
+            self._busy_until = time.monotonic() + self.MEASURE_MS / 1000
+
+    def i2c_read(self, nbytes):
+        busy = time.monotonic() < self._busy_until
+        status = (0x80 if busy else 0) | (0x08 if self.calibrated else 0)
+        frame = bytes([status]) + self._data
+        return (frame + bytes([crc8(frame)]))[:nbytes]
+
+
+class LCD:
+    """HD44780 character LCD behind a PCF8574 I2C backpack.
+
+    Decodes the 4-bit nibble stream (data latched on the falling edge of E)
+    into a text buffer, and counts bus traffic.
+    """
+
+    MASK_RS = 0x01
+    MASK_E = 0x04
+
+    def __init__(self, rows=2, cols=16):
+        self.rows = rows
+        self.cols = cols
+        self.ddram = bytearray(b" " * 0x80)
+        self.address = 0
+        self.four_bit = False
+        self._high = None
+        self._last = 0
+        #: I2C transactions and bytes received
+        self.transactions = 0
+        self.bytes = 0
+
+    def i2c_write(self, data):
+        self.transactions += 1
+        self.bytes += len(data)
+        for b in data:
+            if self._last & self.MASK_E and not b & self.MASK_E:
+                self._nibble(self._last >> 4, self._last & self.MASK_RS)
+            self._last = b
+
+    def i2c_read(self, nbytes):
+        return bytes([self._last]) * nbytes
+
+    def _nibble(self, nibble, rs):
+        if not self.four_bit:
+            # 8-bit mode: only the upper nibble is wired, one per instruction
+            if not rs and nibble == 0x2:
+                self.four_bit = True
+            return
+        if self._high is None:
+            self._high = nibble
+            return
+        value = (self._high << 4) | nibble
+        self._high = None
+        if rs:
+            self.ddram[self.address & 0x7F] = value
+            self.address = (self.address + 1) & 0x7F
+        elif value & 0x80:
+            self.address = value & 0x7F
+        elif value in (0x01, 0x02):
+            if value == 0x01:
+                self.ddram[:] = b" " * 0x80
+            self.address = 0
+
+    def lines(self):
+        """The visible text, one string per row."""
+        starts = (0x00, 0x40, self.cols, 0x40 + self.cols)
+        return [
+            bytes(self.ddram[starts[r]:starts[r] + self.cols]).decode("ascii", "replace")
+            for r in range(self.rows)
+        ]
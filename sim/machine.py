@@ -0,0 +1,260 @@
+"""Stand-in for MicroPython's ``machine`` module.
+
+Pins are shared by number (``Pin(5)`` twice is the same pin, as on the
+board), I2C buses route transactions to the simulated devices attached with
+:func:`attach_i2c`, SPI clocks the devices bit by bit through their pins,
+and ``Timer`` callbacks run on a background thread the way hardware timer
+callbacks interrupt the main program.
+"""
+
+import errno
+import sys
+import threading
+import time
+
+PWRON_RESET = 1
+HARD_RESET = 2
+WDT_RESET = 3
+DEEPSLEEP_RESET = 4
+SOFT_RESET = 5
+BROWNOUT_RESET = 6
+
+#: Value returned by reset_cause(); change it to simulate e.g. a brownout.
+RESET_CAUSE = PWRON_RESET
+
+
+def reset_cause():
+    return RESET_CAUSE
+
+
+def reset():
+    print("[sim] machine.reset() -- exiting")
+    raise SystemExit(0)
+
+
+def soft_reset():
+    reset()
+
+
+def freq(hz=None):
+    return 240_000_000
+
+
+def unique_id():
+    return b"\x24\x0a\xc4\x00\x00\x01"
+
+
+class Pin:
+    IN = 1
+    OUT = 3
+    OPEN_DRAIN = 7
+    PULL_UP = 2
+    PULL_DOWN = 1
+    IRQ_RISING = 1
+    IRQ_FALLING = 2
+
+    _registry = {}
+
+    def __new__(cls, id, *args, **kwargs):
+        pin = cls._registry.get(id)
+        if pin is None:
+            pin = object.__new__(cls)
+            pin.id = id
+            pin.mode = None
+            pin.pull = None
+            pin._value = 0
+            pin._source = None      # callable driving an input (simulated device)
+            pin._listeners = []     # callables(pin, value) on every level change
+            cls._registry[id] = pin
+        return pin
+
+    def __init__(self, id, mode=-1, pull=-1, *, value=None, **kwargs):
+        self.init(mode, pull, value=value)
+
+    def init(self, mode=-1, pull=-1, *, value=None, **kwargs):
+        if mode != -1:
+            self.mode = mode
+        if pull != -1:
+            self.pull = pull
+        if value is not None:
+            self._set(value)
+
+    @classmethod
+    def get(cls, id):
+        """Return the pin with this number (sim only)."""
+        return cls(id)
+
+    def value(self, x=None):
+        if x is None:
+            if self._source is not None:
+                return 1 if self._source() else 0
+            return self._value
+        self._set(x)
+
+    def __call__(self, x=None):
+        return self.value(x)
+
+    def on(self):
+        self._set(1)
+
+    def off(self):
+        self._set(0)
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING):
+        return None
+
+    def _set(self, x):
+        x = 1 if x else 0
+        if x == self._value:
+            return
+        self._value = x
+        for listener in self._listeners:
+            listener(self, x)
+
+    def __repr__(self):
+        return "Pin({})".format(self.id)
+
+
+class I2C:
+    _buses = {}
+
+    def __init__(self, id=0, *, scl=None, sda=None, freq=400000, timeout=50000):
+        self.id = id
+        self.freq = freq
+        self._devices = I2C._buses.setdefault(id, {})
+
+    def init(self, *args, **kwargs):
+        pass
+
+    def scan(self):
+        return sorted(self._devices)
+
+    def _device(self, addr):
+        device = self._devices.get(addr)
+        if device is None:
+            # What the ESP32 port raises when nobody ACKs the address
+            raise OSError(errno.ENODEV, "ENODEV")
+        return device
+
+    def writeto(self, addr, buf, stop=True):
+        self._device(addr).i2c_write(bytes(buf))
+        return len(buf)
+
+    def readfrom(self, addr, nbytes, stop=True):
+        return bytes(self._device(addr).i2c_read(nbytes))
+
+    def readfrom_into(self, addr, buf, stop=True):
+        data = self._device(addr).i2c_read(len(buf))
+        buf[: len(data)] = data
+
+    def writevto(self, addr, vector, stop=True):
+        return self.writeto(addr, b"".join(bytes(b) for b in vector), stop)
+
+
+class SoftI2C(I2C):
+    def __init__(self, scl, sda, *, freq=400000, timeout=50000):
+        super().__init__(("soft", scl.id), freq=freq)
+
+
+def attach_i2c(bus_id, addr, device):
+    """Put a simulated device on an I2C bus (sim only)."""
+    I2C._buses.setdefault(bus_id, {})[addr] = device
+
+
+def detach_i2c(bus_id, addr):
+    """Unplug a simulated device from an I2C bus (sim only)."""
+    I2C._buses.get(bus_id, {}).pop(addr, None)
+
+
+class SPI:
+    """SPI controller clocking the simulated devices through their pins.
+
+    Mode 0 only (sample MISO, then a rising and a falling SCK edge per bit),
+    which is what the MAX6675 speaks. Chip select stays with the caller.
+    """
+
+    MSB = 0
+    LSB = 1
+
+    def __init__(self, id=1, baudrate=1000000, *, polarity=0, phase=0, bits=8,
+                 firstbit=MSB, sck=None, mosi=None, miso=None):
+        if polarity or phase:
+            raise ValueError("sim SPI only supports mode 0")
+        if sck is None or miso is None:
+            raise ValueError("sck and miso pins are required")
+        self.id = id
+        self.baudrate = baudrate
+        self._sck = sck if isinstance(sck, Pin) else Pin(sck)
+        self._miso = miso if isinstance(miso, Pin) else Pin(miso)
+        self._sck.init(Pin.OUT, value=0)
+
+    def init(self, *args, **kwargs):
+        pass
+
+    def deinit(self):
+        pass
+
+    def _byte(self, out=0):
+        value = 0
+        for _ in range(8):
+            value = (value << 1) | self._miso.value()
+            self._sck.on()
+            self._sck.off()
+        return value
+
+    def read(self, nbytes, write=0x00):
+        return bytes(self._byte(write) for _ in range(nbytes))
+
+    def readinto(self, buf, write=0x00):
+        for i in range(len(buf)):
+            buf[i] = self._byte(write)
+
+    def write(self, buf):
+        for b in buf:
+            self._byte(b)
+
+    def write_readinto(self, write_buf, read_buf):
+        for i in range(len(read_buf)):
+            read_buf[i] = self._byte(write_buf[i])
+
+
+class SoftSPI(SPI):
+    def __init__(self, baudrate=500000, *, polarity=0, phase=0, bits=8,
+                 firstbit=SPI.MSB, sck=None, mosi=None, miso=None):
+        super().__init__(-1, baudrate, polarity=polarity, phase=phase,
+                         sck=sck, mosi=mosi, miso=miso)
+
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1, **kwargs):
+        self.id = id
+        self._stop = None
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(self, *, mode=PERIODIC, period=-1, freq=-1, callback=None):
+        self.deinit()
+        interval = 1.0 / freq if freq > 0 else period / 1000.0
+        stop = threading.Event()
+
+        def run():
+            deadline = time.monotonic() + interval
+            while not stop.wait(max(0.0, deadline - time.monotonic())):
+                try:
+                    callback(self)
+                except Exception as e:  # an ISR exception doesn't kill the board
+                    print("[sim] Timer({}) callback error: {}".format(self.id, e), file=sys.stderr)
+                if mode == Timer.ONE_SHOT:
+                    break
+                deadline += interval
+
+        self._stop = stop
+        threading.Thread(target=run, daemon=True).start()
+
+    def deinit(self):
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
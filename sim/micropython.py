@@ -0,0 +1,25 @@
+"""Stand-in for MicroPython's ``micropython`` module."""
+
+
+def const(expr):
+    return expr
+
+
+def native(f):
+    return f
+
+
+def viper(f):
+    return f
+
+
+def mem_info(verbose=None):
+    pass
+
+
+def alloc_emergency_exception_buf(size):
+    pass
+
+
+def schedule(func, arg):
+    func(arg)
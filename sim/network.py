@@ -0,0 +1,52 @@
+"""Stand-in for MicroPython's ``network`` module (ESP32 WLAN only)."""
+
+STA_IF = 0
+AP_IF = 1
+
+STAT_IDLE = 1000
+STAT_CONNECTING = 1001
+STAT_GOT_IP = 1010
+
+_interfaces = {
+    STA_IF: {"active": False, "ifconfig": ("0.0.0.0", "0.0.0.0", "0.0.0.0", "0.0.0.0"), "config": {}},
+    AP_IF: {
+        "active": True,
+        "ifconfig": ("192.168.4.1", "255.255.255.0", "192.168.4.1", "0.0.0.0"),
+        "config": {"essid": "PyRoaster-AP"},
+    },
+}
+
+
+class WLAN:
+    def __init__(self, interface_id=STA_IF):
+        self._if = _interfaces[interface_id]
+
+    def active(self, is_active=None):
+        if is_active is None:
+            return self._if["active"]
+        self._if["active"] = bool(is_active)
+
+    def isconnected(self):
+        return self._if["active"] and self._if["ifconfig"][0] != "0.0.0.0"
+
+    def status(self, *args):
+        return STAT_GOT_IP if self.isconnected() else STAT_IDLE
+
+    def ifconfig(self, config=None):
+        if config is None:
+            return self._if["ifconfig"]
+        self._if["ifconfig"] = tuple(config)
+
+    def config(self, *args, **kwargs):
+        if args:
+            return self._if["config"].get(args[0])
+        self._if["config"].update(kwargs)
+
+    def connect(self, *args, **kwargs):
+        pass
+
+    def disconnect(self):
+        pass
+
+    def scan(self):
+        return []
@@ -0,0 +1,99 @@
+"""Lumped thermal model of the roaster, for tuning the heater loop on Linux.
+
+Run ``python -m sim.plant`` to drive the firmware's PID + time-proportioned
+heater against the model and print how the roast temperature settles.
+"""
+
+from lib.heater import HeaterController
+from lib.pid import PID
+
+
+class ThermalPlant:
+    """First-order drum + bean mass with heater dead time.
+
+    dT/dt = (power * heater(t - dead_time) - loss * (T - ambient)) / capacity
+    """
+
+    def __init__(
+        self,
+        power_w=3000.0,
+        capacity_j_per_c=6000.0,
+        loss_w_per_c=9.0,
+        ambient_c=25.0,
+        dead_time_s=4.0,
+    ):
+        self.power_w = power_w
+        self.capacity = capacity_j_per_c
+        self.loss = loss_w_per_c
+        self.ambient = ambient_c
+        self.dead_time_s = dead_time_s
+        self.temperature = ambient_c
+        self.heater = False
+        self._pending = []  # (apply_at_s, heater_on)
+        self._now = 0.0
+        self._effective = False
+
+    def step(self, dt):
+        """Advance the model by ``dt`` seconds and return the temperature."""
+        self._now += dt
+        self._pending.append((self._now + self.dead_time_s, self.heater))
+        while self._pending and self._pending[0][0] <= self._now:
+            self._effective = self._pending.pop(0)[1]
+        heat = self.power_w if self._effective else 0.0
+        self.temperature += (
+            (heat - self.loss * (self.temperature - self.ambient)) / self.capacity * dt
+        )
+        return self.temperature
+
+
+class _RelayPin:
+    def __init__(self, plant):
+        self._plant = plant
+
+    def on(self):
+        self._plant.heater = True
+
+    def off(self):
+        self._plant.heater = False
+
+
+def simulate(setpoint=200.0, minutes=20, pid=None, plant=None, tick_ms=100):
+    """Closed-loop run at the firmware rates (PID every 1s, PWM every tick).
+
+    Returns a list of (seconds, temperature, duty) sampled once per second.
+    """
+    plant = plant or ThermalPlant()
+    pid = pid or PID(kp=0.04, ki=0.0004, kd=0.6)
+    heater = HeaterController(_RelayPin(plant))
+    trace = []
+    elapsed = 1000
+    for step in range(int(minutes * 60 * 1000 / tick_ms)):
+        elapsed += tick_ms
+        if elapsed >= 1000:
+            # The firmware only sees whole degrees from the thermocouple
+            heater.set_duty(pid.update(setpoint, int(plant.temperature), elapsed / 1000))
+            elapsed = 0
+            trace.append((step * tick_ms // 1000, plant.temperature, heater.get_duty()))
+        heater.update(tick_ms)
+        plant.step(tick_ms / 1000)
+    return trace
+
+
+def main():
+    setpoint = 200.0
+    trace = simulate(setpoint)
+    peak = max(t for _, t, _ in trace)
+    settled = None
+    for s, t, _ in trace:
+        if abs(t - setpoint) > 2:
+            settled = None
+        elif settled is None:
+            settled = s
+    print("setpoint  : {:.1f} C".format(setpoint))
+    print("overshoot : {:.1f} C".format(max(0.0, peak - setpoint)))
+    print("settled   : {}".format("{}s (+-2C)".format(settled) if settled is not None else "never"))
+    print("final     : {:.1f} C, duty {:.0f}%".format(trace[-1][1], trace[-1][2] * 100))
+
+
+if __name__ == "__main__":
+    main()
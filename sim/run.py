@@ -0,0 +1,80 @@
+"""Boot the firmware (``main.py``) on CPython against the simulated board.
+
+    python -m sim.run --port 8080
+
+The firmware works in a scratch directory (a temp dir, deleted on exit,
+unless ``--fs`` is given) seeded with ``config.json``, so roast logs and
+config edits never touch the repository.
+"""
+
+import argparse
+import asyncio
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def boot(port=8080, fs=None, plant_speed=1.0, **board_options):
+    """Install the simulator, import ``main`` and return (module, board).
+
+    The server is not started; run ``asyncio.run(module.main())`` for that.
+    """
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+    import sim
+
+    board = sim.install(**board_options)
+    board.model.speed = plant_speed
+
+    if fs is None:
+        fs = tempfile.mkdtemp(prefix="pyroaster-")
+        atexit.register(shutil.rmtree, fs, ignore_errors=True)
+    os.makedirs(fs, exist_ok=True)
+    if not os.path.exists(os.path.join(fs, "config.json")):
+        shutil.copy(os.path.join(ROOT, "config.json"), fs)
+    os.chdir(fs)
+
+    import main
+
+    main.HTTP_PORT = port
+    return main, board
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8080, help="HTTP port (default 8080)")
+    parser.add_argument("--fs", help="directory used as the device filesystem")
+    parser.add_argument(
+        "--plant-speed", type=float, default=1.0,
+        help="thermal model time per wall-clock second (default 1)",
+    )
+    parser.add_argument("--no-sht", dest="sht", action="store_false", help="unplug the SHT31")
+    parser.add_argument("--no-max", dest="max6675", action="store_false", help="unplug the MAX6675")
+    parser.add_argument("--no-lcd", dest="lcd", action="store_false", help="unplug the LCD")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    firmware, _ = boot(
+        port=args.port,
+        fs=args.fs,
+        plant_speed=args.plant_speed,
+        sht=args.sht,
+        max6675=args.max6675,
+        lcd=args.lcd,
+    )
+    print("[sim] filesystem: {}".format(os.getcwd()))
+    try:
+        asyncio.run(firmware.main())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""Stand-in for MicroPython's ``webrepl`` module."""
+
+
+def start(*args, **kwargs):
+    pass
+
+
+def stop():
+    pass
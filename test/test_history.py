@@ -0,0 +1,37 @@
+"""GET /history against the firmware booted on the simulated board.
+
+    python -m pytest test
+"""
+
+import asyncio
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from bench.harness import boot, http_request, wait_for_server  # noqa: E402
+
+
+def test_history_without_query_string():
+    firmware, _ = boot()
+
+    async def run():
+        server = asyncio.create_task(firmware.server_task())
+        await wait_for_server(firmware.HTTP_PORT)
+        try:
+            # no roast yet: request.args is a plain dict, not a MultiDict
+            status, body = await http_request(firmware.HTTP_PORT, "GET", "/history")
+            assert status == 404, body
+
+            firmware.recorder.start()
+            firmware.record_roast()
+            firmware.recorder.stop()
+            status, body = await http_request(firmware.HTTP_PORT, "GET", "/history")
+            assert status == 200, body
+            assert body.startswith(b"t,"), body
+        finally:
+            server.cancel()
+
+    asyncio.run(run())
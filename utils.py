@@ -1,6 +1,7 @@
 def validate_body(data, rules):
     """Validate request body fields.
     rules: {field: (type, required, extra)}
+    type: a type or a tuple of types, e.g. (int, float) for any number.
     extra: None or dict with "enum", "min", "max" keys.
     Returns None on success, error string on failure."""
     for field, (typ, required, extra) in rules.items():
@@ -9,8 +10,10 @@ def validate_body(data, rules):
             if required:
                 return f"'{field}' is required"
             continue
-        if not isinstance(val, typ) or (typ is int and isinstance(val, bool)):
-            return f"'{field}' must be {typ.__name__}"
+        types = typ if isinstance(typ, tuple) else (typ,)
+        if not isinstance(val, types) or (int in types and isinstance(val, bool)):
+            names = " or ".join([t.__name__ for t in types])
+            return f"'{field}' must be {names}"
         if extra:
             if "enum" in extra and val not in extra["enum"]:
                 return f"'{field}' must be one of {extra['enum']}"
@@ -74,13 +77,14 @@ def start_access_point():
     return True
 
 
-async def led_status_task(get_error_blinks):
+async def led_status_task(get_error_blinks, timing=None):
     """LED status indicator.
 
     get_error_blinks: callable returning the current blink code, re-evaluated
     every cycle. Evaluating live (instead of latching a boot-time value) means a
     transient sensor glitch at startup no longer pins the fault indication on
     forever -- the LED follows the sensors' real current state.
+    timing: optional TimingMonitor; wake-up lateness is recorded as "led".
 
     code == 0: solid on (AP up) / solid off (AP down)
     code  > 0: blink N times, 3s pause, repeat
@@ -92,15 +96,18 @@ async def led_status_task(get_error_blinks):
     led = Pin(2, Pin.OUT, value=0)
     ap = network.WLAN(network.AP_IF)
 
+    def sleep(seconds):
+        return asyncio.sleep(seconds) if timing is None else timing.sleep("led", seconds)
+
     while True:
         error_blinks = get_error_blinks()
         if error_blinks == 0:
             led.value(1 if ap.active() else 0)
-            await asyncio.sleep(1)
+            await sleep(1)
         else:
             for _ in range(error_blinks):
                 led.on()
-                await asyncio.sleep(0.2)
+                await sleep(0.2)
                 led.off()
-                await asyncio.sleep(0.2)
-            await asyncio.sleep(3)
+                await sleep(0.2)
+            await sleep(3)